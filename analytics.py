@@ -0,0 +1,167 @@
+import json
+import os
+from itertools import islice
+from multiprocessing import Pool
+
+import numpy as np
+
+from rules import row_label
+
+
+def iter_batches(path, batch_size=10000, start=0, end=None):
+    """Yield lists of game records from a JSON-lines log, batch_size at a time
+
+    start/end are byte offsets so several processes can split one file; a record
+    belongs to the range its first byte falls in.
+    """
+    with open(path, 'rb') as f:
+        if start:
+            # Skip the partial record, the previous range owns it
+            f.seek(start - 1)
+            f.readline()
+        while True:
+            lines = []
+            for line in islice(f, batch_size):
+                if end is not None and f.tell() - len(line) >= end:
+                    break
+                lines.append(line)
+            if not lines:
+                return
+            yield [json.loads(line) for line in lines]
+            if len(lines) < batch_size:
+                return
+
+
+def split_file(path, parts):
+    """Byte ranges [(start, end)] that split a log into roughly equal parts"""
+    size = os.path.getsize(path)
+    bounds = [size * i // parts for i in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# CLASS: GameStats
+class GameStats:
+    """Per-cell and per-ship counters accumulated over any number of game records
+
+    Memory use is fixed by the board size and fleet, not by the number of games,
+    and two GameStats can be merged, so chunks can be counted in separate processes.
+    """
+
+    def __init__(self, ship_list, size=10):
+        self.ship_names = [name for name, _ in ship_list]
+        self.lengths = [length for _, length in ship_list]
+        self.size = size
+        n = size * size
+        self.fleets = 0                                          # fleets (sides) counted
+        self.ship_cells = np.zeros(n, dtype=np.int64)            # where ships end up
+        self.first_hits = np.zeros(n, dtype=np.int64)            # where each fleet is first hit
+        self.shots = np.zeros(n, dtype=np.int64)                 # where shots land
+        self.hits = np.zeros(n, dtype=np.int64)                  # where shots hit
+        # sink_turns[ship, t]: ship sunk on the t-th shot at its fleet (t = 0 means it survived)
+        self.sink_turns = np.zeros((len(ship_list), n + 1), dtype=np.int64)
+
+    def add_batch(self, records):
+        """Count one batch of game records"""
+        size = self.size
+        for record in records:
+            for side in record["sides"]:
+                occupied = np.zeros(size * size, dtype=bool)
+                for (y, x, direction), length in zip(side["fleet"], self.lengths):
+                    if direction == 'H':
+                        occupied[y * size + x:y * size + x + length] = True
+                    else:
+                        occupied[(y * size + x) + size * np.arange(length)] = True
+
+                shots = np.asarray(side["shots"], dtype=np.intp)
+                hit = occupied[shots]
+                self.ship_cells += occupied
+                self.shots += np.bincount(shots, minlength=size * size)
+                self.hits += np.bincount(shots[hit], minlength=size * size)
+                if hit.any():
+                    self.first_hits[shots[np.argmax(hit)]] += 1
+
+                turns = [t or 0 for t in side["sink_turns"]]
+                self.sink_turns[np.arange(len(turns)), turns] += 1
+                self.fleets += 1
+
+    def merge(self, other):
+        """Add the counts of another GameStats into this one"""
+        self.fleets += other.fleets
+        self.ship_cells += other.ship_cells
+        self.first_hits += other.first_hits
+        self.shots += other.shots
+        self.hits += other.hits
+        self.sink_turns += other.sink_turns
+        return self
+
+    def heatmap(self, name="ship_cells"):
+        """One counter as a size x size array of frequencies per fleet"""
+        counts = getattr(self, name).reshape(self.size, self.size)
+        return counts / max(1, self.fleets)
+
+    def summary(self):
+        """Shots-to-sink per ship type: [(name, sunk, mean, median, p90)]"""
+        rows = []
+        turns = np.arange(self.size * self.size + 1)
+        for s, name in enumerate(self.ship_names):
+            hist = self.sink_turns[s].copy()
+            hist[0] = 0  # survivors have no sink turn
+            sunk = int(hist.sum())
+            if sunk == 0:
+                rows.append((name, 0, None, None, None))
+                continue
+            cdf = np.cumsum(hist)
+            mean = float((hist * turns).sum() / sunk)
+            median = int(np.searchsorted(cdf, sunk * 0.5))
+            p90 = int(np.searchsorted(cdf, sunk * 0.9))
+            rows.append((name, sunk, mean, median, p90))
+        return rows
+
+    def format_heatmap(self, name="ship_cells"):
+        """Heatmap as a text table in percent"""
+        freq = self.heatmap(name) * 100
+        lines = ["    " + "".join(f"{c:>6}" for c in range(1, self.size + 1))]
+        for y in range(self.size):
+            lines.append(f"{row_label(y):>3} " + "".join(f"{v:6.1f}" for v in freq[y]))
+        return "\n".join(lines)
+
+    def format_summary(self):
+        lines = [f"{'Ship':<18}{'sunk':>8}{'mean':>8}{'p50':>6}{'p90':>6}"]
+        for name, sunk, mean, median, p90 in self.summary():
+            if sunk == 0:
+                lines.append(f"{name:<18}{0:>8}{'-':>8}{'-':>6}{'-':>6}")
+            else:
+                lines.append(f"{name:<18}{sunk:>8}{mean:8.1f}{median:>6}{p90:>6}")
+        return "\n".join(lines)
+
+
+def aggregate_range(path, ship_list, size=10, batch_size=10000, start=0, end=None):
+    """Stream one byte range of a log into a GameStats"""
+    stats = GameStats(ship_list, size)
+    for batch in iter_batches(path, batch_size, start, end):
+        stats.add_batch(batch)
+    return stats
+
+
+def _aggregate_job(args):
+    return aggregate_range(*args)
+
+
+def aggregate(paths, ship_list, size=10, batch_size=10000, processes=1):
+    """Aggregate one or more logs, split across processes, into a single GameStats"""
+    if isinstance(paths, str):
+        paths = [paths]
+    jobs = []
+    for path in paths:
+        for start, end in split_file(path, processes):
+            jobs.append((path, ship_list, size, batch_size, start, end))
+
+    total = GameStats(ship_list, size)
+    if processes == 1:
+        for job in jobs:
+            total.merge(_aggregate_job(job))
+        return total
+    with Pool(processes) as pool:
+        for stats in pool.imap_unordered(_aggregate_job, jobs):
+            total.merge(stats)
+    return total
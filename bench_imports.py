@@ -0,0 +1,33 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Worker start-up cost: a fresh interpreter that imports the engine and sets up a Game
+ENGINE = "import classes; classes.Game(); classes.Player('p')"
+# What every worker paid before the engine stopped importing pygame and pandas
+EAGER = "import pandas, pygame; " + ENGINE
+
+
+def spawn_time(code, runs=15):
+    """Median wall time (s) to start python, run code and exit"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=here, env=env, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    bare = spawn_time("pass", runs)
+    lazy = spawn_time(ENGINE, runs)
+    eager = spawn_time(EAGER, runs)
+    print(f"python startup:          {bare * 1000:7.1f} ms")
+    print(f"engine (lazy imports):   {lazy * 1000:7.1f} ms")
+    print(f"engine + pandas/pygame:  {eager * 1000:7.1f} ms")
+    print(f"saved per worker spawn:  {(eager - lazy) * 1000:7.1f} ms ({(1 - lazy / eager) * 100:.0f}%)")
@@ -1,16 +1,32 @@
 import numpy as np
-import pandas as pd
-import random
-import pygame
+import struct
+import sys
+import time
+from array import array
 
+from rules import CLASSIC_RULES, mask_to_vector, rule_tables
+from seeding import game_seed, game_streams, shared_rng
+from terminal_renderer import TerminalRenderer, format_grid
 
 # CLASS: Ship
 class Ship:
+    __slots__ = ('name', 'length', 'y', 'x', 'vertical', 'hits')
+
     def __init__(self, name, length):
         self.name = name
         self.length = length
-        self.coordinates = []  # [(row, col)]
-        self.hits = set()
+        self.y = self.x = None  # first cell once placed
+        self.vertical = False
+        self.hits = 0  # bit i is set once coordinates[i] has been hit
+
+    @property
+    def coordinates(self):
+        """Cells covered by the ship: ((row, col), ...), empty until placed"""
+        if self.y is None:
+            return ()
+        if self.vertical:
+            return tuple((self.y + i, self.x) for i in range(self.length))
+        return tuple((self.y, self.x + i) for i in range(self.length))
 
     def place(self, start_coord, direction, board):
         """Try to place ship on given board"""
@@ -37,194 +53,574 @@ class Ship:
 
         # Place
         for cy, cx in coords:
-            board.grid.iat[cy, cx] = 1
-        self.coordinates = coords
+            board.grid[cy, cx] = 1
+        self.y, self.x, self.vertical = y, x, direction == 'V'
         return True, "Placed successfully."
 
+    def covers(self, y, x):
+        """Check if the ship lies on (y,x)"""
+        if self.y is None:
+            return False
+        if self.vertical:
+            return x == self.x and self.y <= y < self.y + self.length
+        return y == self.y and self.x <= x < self.x + self.length
+
     def register_hit(self, coord):
         """Record a hit on the ship"""
-        if coord in self.coordinates:
-            self.hits.add(coord)
+        y, x = coord
+        if self.covers(y, x):
+            self.hits |= 1 << ((y - self.y) if self.vertical else (x - self.x))
             return True
         return False
 
     def is_sunk(self):
         """Check if all ship parts are hit"""
-        return set(self.coordinates) == self.hits
+        return self.y is not None and self.hits == (1 << self.length) - 1
+
+# CLASS: PlacementError
+class PlacementError(ValueError):
+    """Raised when ships cannot be placed (no legal spot, or none found within the time budget)"""
+
 
 # CLASS: Board
 class Board:
-    def __init__(self, size=10):
+    __slots__ = ('size', 'tables', 'grid', 'ships', 'rng')
+
+    def __init__(self, size=10, rules=None, rng=None):
+        if rules is not None:
+            size = rules.size
         self.size = size
-        self.grid = self._create_grid()
+        # Neighbour and label tables shared by every board with the same rules
+        self.tables = rules.tables if rules is not None else rule_tables(size)
+        self.grid = np.zeros((self.size, self.size), dtype=np.int8)
         self.ships = []
-        self.ship_map = {}  # maps (y, x) → Ship
+        # NumPy Generator for random placement; boards without one share an unseeded generator
+        self.rng = rng if rng is not None else shared_rng()
+
+    @property
+    def labels(self):
+        """Row letters"""
+        return self.tables.labels
+
+    def to_frame(self):
+        """Grid as a labelled pandas DataFrame (pandas is only imported here)"""
+        import pandas as pd
+        return pd.DataFrame(self.grid, index=self.labels, columns=list(range(1, self.size + 1)))
+
+    def on_board(self, letter, num):
+        """Check if a row letter and column number lie on the board"""
+        return letter in self.tables.row_of and 1 <= num <= self.size
+
+    def parse_coord(self, coord):
+        """(y, x) of a coordinate such as 'B7' or 'AB12', or None if it is malformed or off the board"""
+        letter = ''.join(c for c in coord if c.isalpha())
+        digits = ''.join(c for c in coord if c.isdecimal())
+        if not letter or not digits or not self.on_board(letter, int(digits)):
+            return None
+        return self.tables.row_of[letter], int(digits) - 1
 
-    def _create_grid(self):
-        letters = [chr(i) for i in range(ord('A'), ord('A') + self.size)]
-        return pd.DataFrame(np.zeros((self.size, self.size), dtype=int),
-                            index=letters, columns=list(range(1, self.size + 1)))
+    def coord_name(self, y, x):
+        """Coordinate of cell (y, x) as typed by players, e.g. 'B7'"""
+        return f"{self.labels[y]}{x + 1}"
 
     def is_occupied_or_adjacent(self, y, x):
-        """Check if (y,x) or adjacent cells are occupied"""
-        max_index = self.size - 1
-        neighbors = [(y + dy, x + dx)
-                     for dy in [-1, 0, 1] for dx in [-1, 0, 1]
-                     if not (dy == 0 and dx == 0)]
-        for ny, nx in neighbors + [(y, x)]:
-            if 0 <= ny <= max_index and 0 <= nx <= max_index:
-                if self.grid.iat[ny, nx] != 0:
-                    return True
-        return False
+        """Check if (y,x) or the cells a ship there may not touch are occupied"""
+        return self.grid.ravel()[self.tables.neighbours[y * self.size + x]].any()
+
+    def add_ship(self, ship):
+        """Register a ship that has been placed on this board"""
+        self.ships.append(ship)
 
-    def place_ship_manual(self, ship):
-        """Manual ship placement"""
+    def ship_at(self, y, x):
+        """Ship occupying (y,x), or None"""
+        if self.grid[y, x] <= 0:
+            return None
+        for ship in self.ships:
+            if ship.covers(y, x):
+                return ship
+        return None
+
+    def place_ship_manual(self, ship, history=None):
+        """Manual ship placement
+
+        With a PlacementHistory, U undoes the last placement and Y redoes one; the
+        ship is then not placed and 'undo' or 'redo' is returned so the caller can
+        move through its fleet list.
+        """
         placed = False
         while not placed:
             print(f"Placing {ship.name} (length {ship.length})")
-            direction = input("Choose Horizontally (H) or Vertically (V): ").strip().upper()
+            if history is not None:
+                direction = input("Choose Horizontally (H) or Vertically (V), or U to undo / Y to redo: ").strip().upper()
+                if direction in ['U', 'Y']:
+                    moved = history.undo() if direction == 'U' else history.redo()
+                    if moved is None:
+                        print("Nothing to undo." if direction == 'U' else "Nothing to redo.")
+                        continue
+                    print(format_grid(self))
+                    return 'undo' if direction == 'U' else 'redo'
+            else:
+                direction = input("Choose Horizontally (H) or Vertically (V): ").strip().upper()
             if direction not in ['H', 'V']:
                 print("Invalid direction.")
                 continue
 
             coord = input("Enter coordinate (e.g., D5): ").strip().upper()
-            if len(coord) < 2 or not coord[0].isalpha() or not coord[1:].isdigit():
-                print("Invalid format.")
-                continue
-            y = ord(coord[0]) - ord('A')
-            x = int(coord[1:]) - 1
-            if not (0 <= y < self.size and 0 <= x < self.size):
-                print("Out of range.")
+            cell = self.parse_coord(coord)
+            if cell is None:
+                print("Invalid coordinate.")
                 continue
+            y, x = cell
 
-            success, msg = ship.place((y, x), direction, self)
+            if history is not None:
+                success, msg = history.place(ship, (y, x), direction)
+            else:
+                success, msg = ship.place((y, x), direction, self)
+                if success:
+                    self.add_ship(ship)
             if success:
-                self.ships.append(ship)
-                for c in ship.coordinates:
-                    self.ship_map[c] = ship
                 print(f"{ship.name} placed successfully.")
-                print(self.grid)
+                print(format_grid(self))
                 placed = True
             else:
                 print(msg)
+        return None
 
-    def place_ship_random(self, ship):
-        """Random ship placement"""
-        placed = False
-        while not placed:
-            direction = random.choice(['H', 'V'])
-            y = random.randint(0, self.size - 1)
-            x = random.randint(0, self.size - 1)
-            success, _ = ship.place((y, x), direction, self)
-            if success:
-                self.ships.append(ship)
-                for c in ship.coordinates:
-                    self.ship_map[c] = ship
-                placed = True
+    def place_ship_random(self, ship, batch=16):
+        """Random ship placement (raises PlacementError if the ship fits nowhere)"""
+        cells = self.size * self.size
+        while True:
+            # Draw candidates in bulk as one integer each: direction * cells + y * size + x
+            for candidate in self.rng.integers(2 * cells, size=batch).tolist():
+                vertical, cell = divmod(candidate, cells)
+                y, x = divmod(cell, self.size)
+                success, _ = ship.place((y, x), 'V' if vertical else 'H', self)
+                if success:
+                    self.add_ship(ship)
+                    return
+            # A whole batch missed: make sure there is a spot left before drawing again
+            blocked = self.blocked_mask()
+            if all(m & blocked for m in self.tables.ship_masks(ship.length)[0]):
+                raise PlacementError(f"No room left for the {ship.name} ({ship.length} cells).")
+
+    def place_fleet_random(self, ship_list, time_budget=1.0):
+        """Place a whole fleet at random, backtracking out of dead ends
+
+        Ships are placed longest first, each on a random spot that is still legal.
+        When a later ship has nowhere to go, earlier ships are moved. Raises
+        PlacementError if no layout exists, or if none is found within time_budget
+        seconds; the board is left unchanged in both cases.
+        """
+        deadline = time.monotonic() + time_budget
+        order = sorted(range(len(ship_list)), key=lambda i: -ship_list[i][1])
+        candidates = [self.tables.ship_masks(ship_list[i][1]) for i in order]
+        chosen = [None] * len(order)
+        dead = set()  # (ship, blocked cells) states already known to have no completion
+
+        def search(k, blocked):
+            if k == len(order):
+                return True
+            if (k, blocked) in dead:
+                return False
+            if time.monotonic() > deadline:
+                raise PlacementError(f"No layout found within {time_budget} s.")
+            cells, halos = candidates[k]
+            legal = [j for j, m in enumerate(cells) if not m & blocked]
+            for j in self.rng.permutation(legal).tolist() if legal else ():
+                chosen[k] = j
+                if search(k + 1, blocked | halos[j]):
+                    return True
+            dead.add((k, blocked))
+            return False
+
+        if not search(0, self.blocked_mask()):
+            raise PlacementError("The fleet cannot be placed on this board.")
+        placed = [None] * len(ship_list)
+        for k, i in enumerate(order):
+            name, length = ship_list[i]
+            ship = Ship(name, length)
+            ship.place(*self.placement_start(length, chosen[k]), self)
+            placed[i] = ship
+        for ship in placed:
+            self.add_ship(ship)
+
+    def blocked_mask(self):
+        """Bitmask of cells where a new ship cell may not go (taken, or touching a taken cell)"""
+        taken = 0
+        for cell in np.flatnonzero(self.grid).tolist():
+            taken |= 1 << cell
+        return self.tables.with_neighbours(taken)
+
+    def valid_starts(self, length):
+        """Where a ship of this length can go right now: {'H': grid of bools, 'V': grid of bools}
+
+        Entry [y, x] is True when the ship fits with its first cell at (y, x). Built from
+        running sums of the blocked cells along rows and columns (a ship fits where its
+        window sums to zero), so callers can look up hover previews without trying
+        Ship.place, on boards of any size.
+        """
+        size = self.size
+        per_row = size - length + 1
+        starts = {'H': np.zeros((size, size), dtype=bool), 'V': np.zeros((size, size), dtype=bool)}
+        if per_row <= 0:
+            return starts
+        blocked = mask_to_vector(self.blocked_mask(), size).reshape(size, size)
+        rows = np.pad(blocked.cumsum(axis=1), ((0, 0), (1, 0)))
+        starts['H'][:, :per_row] = rows[:, length:] == rows[:, :per_row]
+        cols = np.pad(blocked.cumsum(axis=0), ((1, 0), (0, 0)))
+        starts['V'][:per_row, :] = cols[length:, :] == cols[:per_row, :]
+        return starts
+
+    def placement_start(self, length, index):
+        """((y, x), direction) of placement index in the order of RuleTables.placements"""
+        per_row = self.size - length + 1
+        if index < self.size * per_row:
+            y, x = divmod(index, per_row)
+            return (y, x), 'H'
+        return divmod(index - self.size * per_row, self.size), 'V'
+
+    def placement_index(self, length, start_coord, direction):
+        """Inverse of placement_start, or None if the ship would leave the board"""
+        y, x = start_coord
+        per_row = self.size - length + 1
+        if not (0 <= y < self.size and 0 <= x < self.size):
+            return None
+        if direction == 'H' or length == 1:
+            return y * per_row + x if x < per_row else None
+        if direction == 'V':
+            return self.size * per_row + y * self.size + x if y < per_row else None
+        return None
 
     def receive_attack(self, coord_str):
         """Process attack (returns Ship object if hit, None if miss, or 'invalid' if invalid input)"""
-        if not coord_str or len(coord_str) < 2:
-            return "invalid"
-
-        letter = ''.join([c for c in coord_str if c.isalpha()])
-        digits = ''.join([c for c in coord_str if c.isdigit()])
-        if not letter or not digits:
-            return "invalid"
-
-        try:
-            num = int(digits)
-        except ValueError:
+        cell = self.parse_coord(coord_str) if coord_str else None
+        if cell is None:
             return "invalid"
 
-        if letter not in self.grid.index or num not in self.grid.columns:
-            return "invalid"
-
-        y, x = ord(letter) - ord('A'), num - 1
-        ship = self.ship_map.get((y, x))
+        y, x = cell
+        ship = self.ship_at(y, x)
 
         if ship:
             ship.register_hit((y, x))
-            self.grid.iat[y, x] = 2
+            self.grid[y, x] = 2
             return ship
         else:
-            self.grid.iat[y, x] = -1
+            self.grid[y, x] = -1
             return None
 
+    def receive_salvo(self, cells):
+        """Process several shots in one go (cells are y * size + x, all on the board)
+
+        Returns (results, sunk): the Ship hit or None for every shot, and the ships
+        this salvo sank.
+        """
+        _, results, sunk = self._resolve_salvo(cells)
+        return results, sunk
+
+    def _resolve_salvo(self, cells):
+        cells = np.asarray(cells, dtype=np.intp)
+        flat = self.grid.ravel()
+
+        # Resolve every shot against the grid at once, then credit only the hits to their ships
+        hit = flat[cells] > 0
+        flat[cells] = np.where(hit, 2, -1)
+        results = []
+        sunk = []
+        for cell, is_hit in zip(cells.tolist(), hit.tolist()):
+            if not is_hit:
+                results.append(None)
+                continue
+            y, x = divmod(cell, self.size)
+            ship = self.ship_at(y, x)
+            was_sunk = ship.is_sunk()
+            ship.register_hit((y, x))
+            if not was_sunk and ship.is_sunk():
+                sunk.append(ship)
+            results.append(ship)
+        return hit, results, sunk
+
+    def ships_afloat(self):
+        """Number of ships not sunk yet"""
+        return sum(1 for ship in self.ships if not ship.is_sunk())
+
     def all_sunk(self):
         """Check if all ships are sunk"""
         return all(ship.is_sunk() for ship in self.ships)
 
+# CLASS: PlacementHistory
+class PlacementHistory:
+    """Undo/redo of ship placements on a board, kept as a stack of small deltas
+
+    A delta is (ship, placement index, blocked cells before it), where the index
+    points into the board's precomputed placement masks. Applying or reverting one
+    touches only the ship's own cells, the end of the ship list and the blocked-cell
+    mask, so AI search can also use place()/undo() to try placements and back out.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.blocked = board.blocked_mask()  # cells a new ship cell may not use
+        self.done = []
+        self.undone = []
+
+    def place(self, ship, start_coord, direction):
+        """Place ship if it fits (returns (success, message) like Ship.place); clears the redo stack"""
+        board = self.board
+        index = board.placement_index(ship.length, start_coord, direction)
+        if index is None:
+            return False, "Ship would go off the board."
+        if board.tables.ship_masks(ship.length)[0][index] & self.blocked:
+            return False, "Cell or adjacent already occupied."
+        self.undone.clear()
+        self._apply((ship, index, self.blocked))
+        return True, "Placed successfully."
+
+    def undo(self):
+        """Take back the last placement; returns its ship, or None if there is nothing to undo"""
+        if not self.done:
+            return None
+        delta = self.done.pop()
+        ship, _, blocked = delta
+        flat = self.board.grid.reshape(-1)
+        for y, x in ship.coordinates:
+            flat[y * self.board.size + x] = 0
+        ships = self.board.ships
+        if ships and ships[-1] is ship:
+            ships.pop()
+        else:
+            ships.remove(ship)
+        ship.y = ship.x = None
+        self.blocked = blocked
+        self.undone.append(delta)
+        return ship
+
+    def redo(self):
+        """Put back the last undone placement; returns its ship, or None"""
+        if not self.undone:
+            return None
+        delta = self.undone.pop()
+        self._apply(delta)
+        return delta[0]
+
+    def _apply(self, delta):
+        ship, index, _ = delta
+        board = self.board
+        (ship.y, ship.x), direction = board.placement_start(ship.length, index)
+        ship.vertical = direction == 'V'
+        flat = board.grid.reshape(-1)
+        for y, x in ship.coordinates:
+            flat[y * board.size + x] = 1
+        board.add_ship(ship)
+        self.blocked |= board.tables.ship_masks(ship.length)[1][index]
+        self.done.append(delta)
+
+
 # CLASS: Player
 class Player:
-    def __init__(self, name):
+    __slots__ = ('name', 'board', 'guess_board', 'mode', 'shots', 'unshot', 'unshot_pos', 'strategy', 'placement')
+
+    def __init__(self, name, rules=None, rng=None, shot_rng=None):
         self.name = name
-        self.board = Board()
-        self.guess_board = Board()
+        # rng drives fleet placement and shot_rng random targeting (shot_rng defaults to rng)
+        self.board = Board(rules=rules, rng=rng)
+        self.guess_board = Board(rules=rules, rng=shot_rng if shot_rng is not None else rng)
         self.mode = None
 
-    def setup_fleet(self, ship_list):
-        """Place all ships (manual or random)"""
-        self.mode = input(f"{self.name}, place manually or randomly? (M/R): ").strip().upper()
-        while self.mode not in ['M', 'R']:
-            self.mode = input("Invalid input. Enter M or R: ").strip().upper()
+        # Shot history: bit (y * size + x) is set once that cell has been fired at
+        self.shots = 0
+        # Pool of cells not fired at yet, with each cell's position in the pool for O(1) removal.
+        # Only built the first time random_target() is used, so human players never pay for it.
+        self.unshot = None
+        self.unshot_pos = None
+        # Computer players: a shot strategy and a placement strategy (see strategies.py) instead of input()
+        self.strategy = None
+        self.placement = None
+
+    def has_shot(self, y, x):
+        """Check if (y,x) was already fired at"""
+        return (self.shots >> (y * self.guess_board.size + x)) & 1 == 1
+
+    def record_shot(self, y, x):
+        """Mark (y,x) as fired at and drop it from the unshot pool"""
+        cell = y * self.guess_board.size + x
+        if (self.shots >> cell) & 1:
+            return
+        self.shots |= 1 << cell
+        if self.unshot is None:
+            return
+
+        # Swap the last pool entry into the removed slot
+        pos = self.unshot_pos[cell]
+        last = self.unshot.pop()
+        if last != cell:
+            self.unshot[pos] = last
+            self.unshot_pos[last] = pos
+
+    def random_target(self, rng=None):
+        """Pick a random cell that has not been fired at (returns (y, x) or None)
+
+        The pool is shuffled with rng (default: the guess board's generator) when it is
+        first built. Swap-removing fired cells keeps it in uniformly random order, so the
+        last entry is always a fair pick and no per-shot random draw is needed.
+        """
+        if self.unshot is None:
+            if rng is None:
+                rng = self.guess_board.rng
+            cells = self.guess_board.size * self.guess_board.size
+            free = [c for c in range(cells) if not (self.shots >> c) & 1]
+            self.unshot = array('H', rng.permutation(free).tolist() if free else ())
+            self.unshot_pos = array('H', bytes(2 * cells))
+            for pos, cell in enumerate(self.unshot):
+                self.unshot_pos[cell] = pos
+        if not self.unshot:
+            return None
+        return divmod(self.unshot[-1], self.guess_board.size)
 
-        for name, length in ship_list:
-            ship = Ship(name, length)
-            if self.mode == 'R':
-                self.board.place_ship_random(ship)
-            else:
-                self.board.place_ship_manual(ship)
+    def setup_fleet(self, ship_list, layout_library=None, log=None):
+        """Place all ships (manual or random, optionally drawing random fleets from a LayoutLibrary)
+
+        log, if given, is called as log(i, ship) after ship_list[i] is placed and as
+        log(i, None) when that placement is undone.
+        """
+        if self.placement is not None:
+            self.mode = 'R'
+        else:
+            self.mode = input(f"{self.name}, place manually or randomly? (M/R): ").strip().upper()
+            while self.mode not in ['M', 'R']:
+                self.mode = input("Invalid input. Enter M or R: ").strip().upper()
+
+        first = len(self.board.ships)
+        if self.placement is not None and not self.board.ships:
+            self.placement.place(self.board, ship_list)
+        elif self.mode == 'R' and layout_library is not None and not self.board.ships:
+            layout_library.place(self.board)
+        elif self.mode == 'R':
+            self.board.place_fleet_random(ship_list)
+        else:
+            history = PlacementHistory(self.board)
+            i = 0
+            while i < len(ship_list):
+                action = self.board.place_ship_manual(Ship(*ship_list[i]), history)
+                if action == 'undo':
+                    i -= 1
+                    if log is not None:
+                        log(i, None)
+                    continue
+                if log is not None:
+                    log(i, self.board.ships[-1])
+                i += 1
+        if self.mode == 'R' and log is not None:
+            for i, ship in enumerate(self.board.ships[first:]):
+                log(i, ship)
 
         print(f"\nAll ships placed for {self.name}!\n")
-        print(self.board.grid)
+        print(format_grid(self.board))
+
+    def fire(self, opponent, y, x):
+        """Fire at (y,x) without prompting (returns Ship object if hit, None if miss)"""
+        result = opponent.board.receive_attack(opponent.board.coord_name(y, x))
+        self.record_shot(y, x)
+
+        if isinstance(result, Ship):
+            self.guess_board.grid[y, x] = 1
+            if result.is_sunk():
+                # Change all relevant cells from 1 to 2 on BOTH boards
+                for (sy, sx) in result.coordinates:
+                    opponent.board.grid[sy, sx] = 2
+                    self.guess_board.grid[sy, sx] = 2
+        else:
+            self.guess_board.grid[y, x] = -1
+        return result
+
+    def fire_salvo(self, opponent, cells):
+        """Fire several shots at once without prompting (cells are y * size + x)
+
+        Returns (results, sunk) as Board.receive_salvo does.
+        """
+        cells = np.asarray(cells, dtype=np.intp)
+        hit, results, sunk = opponent.board._resolve_salvo(cells)
+        self.guess_board.grid.ravel()[cells] = np.where(hit, 1, -1)
+        size = self.guess_board.size
+        for cell in cells.tolist():
+            self.record_shot(*divmod(cell, size))
+        for ship in sunk:
+            for (sy, sx) in ship.coordinates:
+                opponent.board.grid[sy, sx] = 2
+                self.guess_board.grid[sy, sx] = 2
+        return results, sunk
+
+    def salvo_attack(self, opponent, count):
+        """Ask for a salvo of count targets and fire them together (returns shots fired)"""
+        size = self.guess_board.size
+        count = min(count, size * size - bin(self.shots).count('1'))
+        if self.strategy is not None:
+            picks = []
+            for _ in range(count):
+                y, x = self.strategy.choose()
+                self.record_shot(y, x)  # so the next pick is a different cell
+                picks.append((y, x))
+            cells = [y * size + x for y, x in picks]
+            coords = [self.guess_board.coord_name(y, x) for y, x in picks]
+        while self.strategy is None:
+            coords = input(f"{self.name}, enter {count} targets separated by spaces (e.g., B7 C3): ").upper().split()
+            if len(coords) != count:
+                print(f"Enter exactly {count} targets.")
+                continue
+            cells = []
+            for coord in coords:
+                cell = self.guess_board.parse_coord(coord)
+                if cell is None:
+                    print(f"Invalid coordinates: {coord}. Try again.")
+                    break
+                y, x = cell
+                if self.has_shot(y, x) or y * size + x in cells:
+                    print(f"You already shot at {coord}, try aiming elsewhere.")
+                    break
+                cells.append(y * size + x)
+            else:
+                break
+
+        results, sunk = self.fire_salvo(opponent, cells)
+        if self.strategy is not None:
+            for (y, x), result in zip(picks, results):
+                self.strategy.update(y, x, result)
+        for coord, result in zip(coords, results):
+            print(f"  {coord}: {'HIT' if result is not None else 'miss'}")
+        for ship in sunk:
+            print(f"{self.name} sank {opponent.name}'s {ship.name}!")
+        return len(cells)
 
     def attack(self, opponent):
-        """Perform attack on opponent's board with retry if invalid"""
+        """Perform attack on opponent's board (a computer player asks its strategy for the target)"""
+        if self.strategy is not None:
+            y, x = self.strategy.choose()
+        else:
+            y, x = self.ask_target()
+        result = self.fire(opponent, y, x)
+        if self.strategy is not None:
+            self.strategy.update(y, x, result)
+        if isinstance(result, Ship):
+            print(f"{self.name} HIT {opponent.name}'s ship!")
+            if result.is_sunk():
+                print(f"{self.name} sank {opponent.name}'s {result.name}!")
+        else:
+            print(f"{self.name} MISSED.")
+
+    def ask_target(self):
+        """Ask for a target until a valid, untried one is given (returns (y, x))"""
         while True:
             coord = input(f"{self.name}, enter target (e.g., B7): ").strip().upper()
-            letter = ''.join([c for c in coord if c.isalpha()])
-            digits = ''.join([c for c in coord if c.isdigit()])
-            if not letter or not digits:
-                print("Invalid coordinates. Try again.")
-                continue
-            try:
-                num = int(digits)
-            except ValueError:
+            cell = self.guess_board.parse_coord(coord)
+            if cell is None:
                 print("Invalid coordinates. Try again.")
                 continue
-            # Check redundancy on guess board
-            if letter in self.guess_board.grid.index and num in self.guess_board.grid.columns:
-                prev_status = self.guess_board.grid.loc[letter, num]
-                if prev_status == 1 or prev_status == -1:
-                    print("You already shot here, try aiming elsewhere.")
-                    continue
-
-            result = opponent.board.receive_attack(coord)
+            y, x = cell
 
-            if result == "invalid":
-                print("Invalid coordinates. Try again.")
+            # Check redundancy against the shot history
+            if self.has_shot(y, x):
+                print("You already shot here, try aiming elsewhere.")
                 continue
-
-            if isinstance(result, Ship):
-                self.guess_board.grid.loc[letter, num] = 1
-                print(f"{self.name} HIT {opponent.name}'s ship!")
-                if result.is_sunk():
-                    print(f"{self.name} sank {opponent.name}'s {result.name}!")
-                    # Change all relevant cells from 1 to 2 on BOTH boards
-                    for (y, x) in result.coordinates:
-                        # mark on opponent real board
-                        opponent.board.grid.iat[y, x] = 2
-                        # mark on guessing board
-                        guess_letter = chr(y + ord('A'))
-                        guess_num = x + 1
-                        self.guess_board.grid.loc[guess_letter, guess_num] = 2
-            elif result is None:
-                self.guess_board.grid.loc[letter, num] = -1
-                print(f"{self.name} MISSED.")
-            else:
-                print(result)
-            break  # only break when valid coordinate was given
+            return y, x  # only return when valid coordinate was given
 
 
     def all_sunk(self):
@@ -232,51 +628,248 @@ class Player:
 
 # CLASS: Game
 class Game:
-    def __init__(self):
-        self.ships_to_place = [
-            ('Aircraft carrier', 5),
-            ('Battleship', 4),
-            ('Cruiser', 3),
-            ('Submarine', 3),
-            ('MineSweeper', 2)
-        ]
+    def __init__(self, scoreboard=None, layout_library=None, rules=None, renderer=None, seed=None, log=None,
+                 bots=None, bot_budget=None):
+        self.rules = rules if rules is not None else CLASSIC_RULES
+        self.ships_to_place = self.rules.fleet
         self.players = []
         self.stats = {}  # Track wins per player
+        self.scoreboard = scoreboard  # optional persistent Scoreboard
+        self.layout_library = layout_library  # optional LayoutLibrary (or LayoutCounter for uniform layouts) for random placement
+        self.renderer = renderer  # TerminalRenderer; one is made automatically when stdout is a terminal
+        # Root seed: game n of this session draws from game_seed(seed, 0, n), so a session can be replayed
+        self.seed = seed
+        self.games_started = 0
+        self.log = log  # optional wal.GameLog: every placement and shot is logged so a crashed match can resume
+        # Computer seats: {seat: shot strategy name or (shot strategy, placement strategy)}, each
+        # decision timed and held to bot_budget seconds (see strategies.TimedShooter)
+        self.bots = bots or {}
+        self.bot_budget = bot_budget
 
     def setup(self):
         """Initialize game and players"""
         print("Welcome to Battleship!")
         p1 = input("Enter name for Player 1: ")
         p2 = input("Enter name for Player 2: ")
-        self.players = [Player(p1), Player(p2)]
+        if self.seed is not None:
+            streams = game_streams(game_seed(self.seed, 0, self.games_started))
+            self.players = [Player(p1, self.rules, streams["p1_placement"], streams["p1_shots"]),
+                            Player(p2, self.rules, streams["p2_placement"], streams["p2_shots"])]
+        else:
+            self.players = [Player(p1, self.rules), Player(p2, self.rules)]
+        self.games_started += 1
 
         # Initialize stats if not already present
         for p in [p1, p2]:
             if p not in self.stats:
                 self.stats[p] = 0
 
-        for player in self.players:
-            player.setup_fleet(self.ships_to_place)
+        self._attach_bots()
+        if self.log is not None:
+            self.log.start([p1, p2], self.rules)
+        for seat, player in enumerate(self.players):
+            player.setup_fleet(self.ships_to_place, self.layout_library, self._placement_logger(seat))
+
+    def _attach_bots(self):
+        # Give the computer seats their (timed) strategies
+        if not self.bots:
+            return
+        from strategies import make_placement, make_shooter
+
+        for seat, spec in self.bots.items():
+            shooter, placement = (spec, "random") if isinstance(spec, str) else spec
+            player = self.players[seat]
+            player.strategy = make_shooter(shooter, player, self.bot_budget)
+            player.placement = make_placement(placement, self.bot_budget)
+
+    def _placement_logger(self, seat, first=0):
+        # setup_fleet callback that writes seat's placements to the log (first = fleet index of ship 0)
+        if self.log is None:
+            return None
 
-    def play(self):
-        """Main game loop"""
-        current, opponent = 0, 1
+        def log(i, ship):
+            if ship is None:
+                self.log.unplace(seat)
+            else:
+                self.log.place(seat, first + i, ship)
+        return log
+
+    def resume(self, complete_fleets=True):
+        """Rebuild the last match in self.log if it was not finished
+
+        Replays its placements and shots onto fresh players and returns
+        (seat to move, shots already fired this turn), or None if there is nothing
+        to resume. With complete_fleets, players whose fleet was only partly placed
+        are asked to place the rest.
+        """
+        game = self.log.last_game() if self.log is not None else None
+        if game is None:
+            return None
+        header, moves = game
+        if any(move[0] == 'end' for move in moves):
+            return None
+        from rules import Rules
+        rules = Rules(header["size"], header["fleet"], header["adjacency"], header["shots_per_turn"])
+        if rules != self.rules:
+            raise ValueError("The logged match was played with different rules.")
+
+        self.players = [Player(name, self.rules) for name in header["players"]]
+        for name in header["players"]:
+            self.stats.setdefault(name, 0)
+        self._attach_bots()
+        histories = [PlacementHistory(player.board) for player in self.players]
+        size = self.rules.size
+        current, taken = 0, 0
+        for move in moves:
+            kind, seat = move[0], move[1]
+            if kind == 'place':
+                _, _, index, y, x, vertical = move
+                histories[seat].place(Ship(*self.ships_to_place[index]), (y, x), 'V' if vertical else 'H')
+            elif kind == 'unplace':
+                histories[seat].undo()
+            elif kind == 'shots':
+                attacker, defender = self.players[seat], self.players[1 - seat]
+                if len(move[2]) == 1:
+                    attacker.fire(defender, *divmod(move[2][0], size))
+                else:
+                    attacker.fire_salvo(defender, move[2])
+                taken += 1
+            elif kind == 'turn':
+                current, taken = seat, 0
+
+        if complete_fleets:
+            for seat, player in enumerate(self.players):
+                placed = len(player.board.ships)
+                if placed < len(self.ships_to_place):
+                    print(f"{player.name} still has {len(self.ships_to_place) - placed} ships to place.")
+                    player.setup_fleet(self.ships_to_place[placed:], self.layout_library,
+                                       self._placement_logger(seat, placed))
+        return current, taken
+
+    def play(self, current=0, shots_taken=0):
+        """Main game loop (current and shots_taken pick up a resumed match mid-turn)"""
+        opponent = 1 - current
+        start = time.monotonic()
+        if self.renderer is None and sys.stdout.isatty():
+            self.renderer = TerminalRenderer()
+        if self.renderer is not None:
+            self.renderer.reset()
         while True:
             attacker = self.players[current]
             defender = self.players[opponent]
 
-            print(f"\n{attacker.name}'s turn.")
-            attacker.attack(defender)
-            print("\nYour guess board:")
-            print(attacker.guess_board.grid)
+            if self.renderer is not None:
+                self.renderer.render(attacker, f"{attacker.name}'s turn")
+            else:
+                print(f"\n{attacker.name}'s turn.")
+            if self.rules.salvo:
+                # One shot for every ship the attacker still has afloat
+                if not shots_taken:
+                    before = attacker.shots
+                    attacker.salvo_attack(defender, attacker.board.ships_afloat())
+                    self._log_shots(current, before)
+            else:
+                for _ in range(self.rules.shots_per_turn - shots_taken):
+                    if defender.all_sunk():
+                        break
+                    before = attacker.shots
+                    attacker.attack(defender)
+                    self._log_shots(current, before)
+            shots_taken = 0
+            if self.renderer is not None:
+                # Only the cells that were just fired at get redrawn
+                self.renderer.render(attacker, f"{attacker.name}'s turn", clear_messages=False)
+            else:
+                print("\nYour guess board:")
+                print(format_grid(attacker.guess_board, guess=True))
 
             if defender.all_sunk():
                 print(f"\n{attacker.name} WINS! All ships of {defender.name} are sunk.")
                 self.stats[attacker.name] += 1
+                if self.log is not None:
+                    self.log.finish(current)
+                if self.scoreboard is not None:
+                    # The winner's own shots: what "shots per win" and fastest_wins() rank by
+                    shots = bin(attacker.shots).count('1')
+                    self.scoreboard.record_game(self.players[0].name, self.players[1].name,
+                                                attacker.name, shots, time.monotonic() - start)
                 self.show_stats()
                 break
 
             current, opponent = opponent, current
+            if self.log is not None:
+                self.log.turn(current)
+
+    def _log_shots(self, seat, before):
+        # Log the cells seat fired at since its shot bitset was `before`
+        if self.log is None:
+            return
+        new = self.players[seat].shots & ~before
+        cells = []
+        while new:
+            low = new & -new
+            cells.append(low.bit_length() - 1)
+            new ^= low
+        self.log.shots(seat, cells)
+
+    def pack(self):
+        """Compact bytes snapshot of the current match, for hosting idle games
+
+        Per player: name, ship placements (fleet index, y, x, direction) and the shot
+        bitset. Everything else (hits, misses, sunk ships) follows from replaying the
+        shots, which restore() does.
+        """
+        fleet = list(self.ships_to_place)
+        parts = [struct.pack('<B', len(self.players))]
+        for player in self.players:
+            board = player.board
+            name = player.name.encode('utf-8')
+            parts.append(struct.pack('<B', len(name)) + name)
+            parts.append(struct.pack('<BB', board.size, len(board.ships)))
+            taken = []
+            for ship in board.ships:
+                index = next(i for i, spec in enumerate(fleet)
+                             if spec == (ship.name, ship.length) and i not in taken)
+                taken.append(index)
+                parts.append(struct.pack('<BBBB', index, ship.y, ship.x, ship.vertical))
+            parts.append(player.shots.to_bytes((board.size * board.size + 7) // 8, 'little'))
+        return b''.join(parts)
+
+    def restore(self, data):
+        """Rebuild self.players from a pack() snapshot"""
+        players, shots = [], []
+        pos = 1
+        for _ in range(data[0]):
+            n = data[pos]
+            player = Player(data[pos + 1:pos + 1 + n].decode('utf-8'), self.rules)
+            pos += 1 + n
+            size, n_ships = data[pos], data[pos + 1]
+            pos += 2
+            if size != self.rules.size:
+                raise ValueError("Snapshot was taken with a different board size.")
+            for _ in range(n_ships):
+                index, y, x, vertical = data[pos:pos + 4]
+                pos += 4
+                name, length = self.ships_to_place[index]
+                ship = Ship(name, length)
+                ship.place((y, x), 'V' if vertical else 'H', player.board)
+                player.board.add_ship(ship)
+            nbytes = (size * size + 7) // 8
+            shots.append(int.from_bytes(data[pos:pos + nbytes], 'little'))
+            pos += nbytes
+            players.append(player)
+
+        # Replay every shot onto the opponent's fleet
+        for i, player in enumerate(players):
+            if len(players) < 2:
+                break
+            opponent = players[1 - i]
+            bits = shots[i]
+            while bits:
+                low = bits & -bits
+                player.fire(opponent, *divmod(low.bit_length() - 1, player.guess_board.size))
+                bits ^= low
+        self.players = players
 
     def show_stats(self):
         """Display the current scoreboard"""
@@ -284,335 +877,42 @@ class Game:
         for player, wins in self.stats.items():
             print(f"  {player}: {wins} wins")
 
+    def show_leaderboard(self, limit=10):
+        """Display the all-time leaderboard from the persistent scoreboard"""
+        if self.scoreboard is None:
+            return
+        self.scoreboard.flush()
+        print("\nAll-time leaderboard:")
+        for player, wins, avg_shots in self.scoreboard.leaderboard(limit):
+            print(f"  {player}: {wins} wins ({avg_shots:.1f} shots per win)")
+
     def run(self):
         """Runs the full menu and replay loop"""
         while True:
-            self.setup()
-            self.play()
+            resumed = self.resume()
+            if resumed is not None:
+                print(f"Resuming the unfinished match between {self.players[0].name} and {self.players[1].name}.")
+                self.play(*resumed)
+            else:
+                self.setup()
+                self.play()
 
             again = input("\nDo you want to play again? (Y/N): ").strip().upper()
             if again != 'Y':
                 print("\nFinal Scoreboard:")
                 self.show_stats()
+                self.show_leaderboard()
                 print("\nThanks for playing Battleship! Goodbye 👋")
                 break
             else:
                 print("\nStarting a new game...")
                 # Reset players but keep stats
                 self.players = []
-                
-#CLASS: Interface
-class Interface:
-    def __init__(self):
-        pygame.init()
-
-        # Constants
-        self.tile_size, self.margin = 40, 4
-        self.fps = 30
-
-        # Colours
-        self.white = (255, 255, 255)
-        self.blue = (0, 0, 128)
-        self.green = (0, 200, 0)
-        self.red = (200, 0, 0)
-        self.grey = (150, 150, 150)
-        self.black = (0, 0, 0)
-
-        # Load images
-        self.loading_bg = pygame.image.load("images/loading_screen.png")
-        self.wnd_width, self.wnd_height = self.loading_bg.get_width(), self.loading_bg.get_height()
-        self.screen = pygame.display.set_mode((self.wnd_width, self.wnd_height))
-        pygame.display.set_caption("Batalla Naval")
-        self.clock = pygame.time.Clock()
-
-        self.font = pygame.font.SysFont("arial", 24)
-        self.big_font = pygame.font.SysFont("arial", 48)
-
-        self.button_images = {
-            "p1_manual": pygame.image.load("images/btn_manual.png"),
-            "p1_random": pygame.image.load("images/btn_random.png"),
-            "p2_manual": pygame.image.load("images/btn_manual.png"),
-            "p2_random": pygame.image.load("images/btn_random.png"),
-        }
-
-        self.button_hover_images = {
-            "p1_manual": pygame.image.load("images/btn_manual_hover.png"),
-            "p1_random": pygame.image.load("images/btn_random_hover.png"),
-            "p2_manual": pygame.image.load("images/btn_manual_hover.png"),
-            "p2_random": pygame.image.load("images/btn_random_hover.png"),
-        }
-
-        self.selected_buttons = {
-            "p1_manual": False,
-            "p1_random": False,
-            "p2_manual": False,
-            "p2_random": False,
-        }
-
-        self.switch_images = {
-            "p1": pygame.image.load("images/switch_p1.png"),
-            "p2": pygame.image.load("images/switch_p2.png"),
-        }
-
-        self.win_images = {
-            "p1": pygame.image.load("images/win_p1.png"),
-            "p2": pygame.image.load("images/win_p2.png"),
-        }
-
-        # Game states
-        self.MENU = "menu"
-        self.PLACEMENT = "placement"
-        self.PLAYING = "playing"
-        self.SWITCH = "switch"
-        self.END = "end"
-
-    def draw_text(self, surface, text, x, y, size=24, colour=None):
-        if colour is None:
-            colour = self.white
-        f = pygame.font.SysFont("arial", size)
-        t = f.render(text, True, colour)
-        surface.blit(t, (x, y))
-
-    def draw_button_image(self, key, rect, mouse_pos):
-        if rect.collidepoint(mouse_pos) or self.selected_buttons[key]:
-            img = pygame.transform.scale(self.button_hover_images[key], (rect.width, rect.height))
-        else:
-            img = pygame.transform.scale(self.button_images[key], (rect.width, rect.height))
-        self.screen.blit(img, rect.topleft)
-
-    def draw_board(self, board, offset_x, offset_y, reveal=False, is_guess=False):
-        for row in range(board.size):
-            for col in range(board.size):
-                val = board.grid.iat[row, col]
-                colour = self.blue
-                if val == 1 and reveal and not is_guess:
-                    colour = self.green
-                elif val == 2:
-                    colour = self.red
-                elif val == -1:
-                    colour = self.grey
-
-                rect = pygame.Rect(
-                    offset_x + col * (self.tile_size + self.margin),
-                    offset_y + row * (self.tile_size + self.margin),
-                    self.tile_size,
-                    self.tile_size,
-                )
-                pygame.draw.rect(self.screen, colour, rect)
-                pygame.draw.rect(self.screen, self.white, rect, 2)
-
-    def run(self):
-        state = self.MENU
-        game = Game()
-        player_modes = {"p1": None, "p2": None}
-        players = {"p1": None, "p2": None}
-        current = None
-        opponent = None
-        current_ship_idx = 0
-        placing_dir = "H"
 
-        while True:
-            self.screen.fill(self.black)
-
-            if state == self.MENU:
-                self.screen.blit(self.loading_bg, (0, 0))
-                self.draw_text(self.screen, "Left: Player 1   |   Right: Player 2", 400, 650)
-
-                button_width, button_height = 180, 50
-                buttons = {
-                    "p1_manual": pygame.Rect(100, 250, button_width, button_height),
-                    "p1_random": pygame.Rect(100, 330, button_width, button_height),
-                    "p2_manual": pygame.Rect(744, 250, button_width, button_height),
-                    "p2_random": pygame.Rect(744, 330, button_width, button_height),
-                }
-
-                mouse_pos = pygame.mouse.get_pos()
-                for key, rect in buttons.items():
-                    self.draw_button_image(key, rect, mouse_pos)
-
-                for event in pygame.event.get():
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        for key, rect in buttons.items():
-                            if rect.collidepoint(event.pos):
-                                pkey, mode = key.split("_")
-                                player_modes[pkey] = mode
-                                for k in buttons:
-                                    if k.startswith(pkey):
-                                        self.selected_buttons[k] = (k == key)
-
-                                if all(player_modes.values()):
-                                    # Create player objects once modes selected
-                                    players["p1"] = Player("Player 1")
-                                    players["p2"] = Player("Player 2")
-
-                                    # Handle Player 1 placement
-                                    if player_modes["p1"] == "random":
-                                        for name, length in game.ships_to_place:
-                                            ship = Ship(name, length)
-                                            players["p1"].board.place_ship_random(ship)
-                                            players["p1"].board.ships.append(ship)
-                                        # Player 2 placement or start play
-                                        if player_modes["p2"] == "random":
-                                            for name, length in game.ships_to_place:
-                                                ship = Ship(name, length)
-                                                players["p2"].board.place_ship_random(ship)
-                                                players["p2"].board.ships.append(ship)
-                                            state = self.PLAYING
-                                            current = "p1"
-                                            opponent = "p2"
-                                        else:
-                                            state = self.PLACEMENT
-                                            current = "p2"
-                                            current_ship_idx = 0
-                                    else:
-                                        state = self.PLACEMENT
-                                        current = "p1"
-                                        current_ship_idx = 0
-
-            elif state == self.PLACEMENT:
-                player = players[current]
-                ships = game.ships_to_place
-
-                if current_ship_idx >= len(ships):
-                    # Finished current player's placement
-                    if current == "p1":
-                        if player_modes["p2"] == "manual":
-                            current = "p2"
-                            current_ship_idx = 0
-                        elif player_modes["p2"] == "random":
-                            for name, length in game.ships_to_place:
-                                ship = Ship(name, length)
-                                players["p2"].board.place_ship_random(ship)
-                                players["p2"].board.ships.append(ship)
-                            state = self.PLAYING
-                            current = "p1"
-                            opponent = "p2"
-                        else:
-                            state = self.PLAYING
-                            current = "p1"
-                            opponent = "p2"
-                    else:
-                        state = self.PLAYING
-                        current = "p1"
-                        opponent = "p2"
-                else:
-                    ship_name, ship_len = ships[current_ship_idx]
-                    self.draw_text(self.screen, f"{player.name}: Place {ship_name} (size {ship_len})", 335, 40, 30)
-                    self.draw_text(self.screen, f"Press R to rotate ({placing_dir})", 460, 80, 24)
-                    self.draw_board(player.board, 320, 150, reveal=True)
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                            pygame.quit()
-                            return
-                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                            pygame.quit()
-                            return
-                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                            placing_dir = "V" if placing_dir == "H" else "H"
-                        elif event.type == pygame.MOUSEBUTTONDOWN:
-                            mx, my = event.pos
-                            gx = (mx - 320) // (self.tile_size + self.margin)
-                            gy = (my - 150) // (self.tile_size + self.margin)
-                            if 0 <= gx < 10 and 0 <= gy < 10:
-                                s = Ship(ship_name, ship_len)
-                                success, _ = s.place((gy, gx), placing_dir, player.board)
-                                if success:
-                                    player.board.ships.append(s)
-                                    for c in s.coordinates:
-                                        player.board.ship_map[c] = s
-                                    current_ship_idx += 1
-
-            elif state == self.PLAYING:
-                attacker = players[current]
-                defender = players[opponent]
-                self.draw_text(self.screen, f"{attacker.name}'s Turn", 400, 40, 36)
-                self.draw_text(self.screen, "Your Fleet", 50, 100)
-                self.draw_text(self.screen, "Your Shots", 550, 100)
-                self.draw_board(attacker.board, 50, 150, reveal=True)
-                self.draw_board(attacker.guess_board, 550, 150, is_guess=True)
-
-                result_message = None
-
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        return
-                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        return
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        mx, my = event.pos
-                        gx = (mx - 550) // (self.tile_size + self.margin)
-                        gy = (my - 150) // (self.tile_size + self.margin)
-                        if 0 <= gx < 10 and 0 <= gy < 10:
-                            letter = chr(gy + ord("A"))
-                            coord = f"{letter}{gx + 1}"
-                            result = defender.board.receive_attack(coord)
-
-                            if isinstance(result, Ship):
-                                attacker.guess_board.grid.loc[letter, gx + 1] = 2
-                                result_message = "HIT!"
-                                if result.is_sunk():
-                                    result_message = f"You sank {defender.name}'s {result.name}!"
-                            elif result is None:
-                                attacker.guess_board.grid.loc[letter, gx + 1] = -1
-                                result_message = "Miss!"
-                            else:
-                                result_message = "Invalid coordinate."
-
-                            self.screen.fill(self.black)
-                            self.draw_text(self.screen, f"{attacker.name}'s Turn", 400, 40, 36)
-                            self.draw_text(self.screen, "Your Fleet", 50, 100)
-                            self.draw_text(self.screen, "Your Shots", 550, 100)
-                            self.draw_board(attacker.board, 50, 150, reveal=True)
-                            self.draw_board(attacker.guess_board, 550, 150)
-                            self.draw_text(
-                                self.screen,
-                                result_message,
-                                400,
-                                635,
-                                30,
-                                self.green if "HIT" in result_message or "sank" in result_message else self.white,
-                            )
-                            pygame.display.flip()
-                            pygame.time.wait(1000)
-
-                            if defender.all_sunk():
-                                state = self.END
-                            else:
-                                current, opponent = opponent, current
-                                state = self.SWITCH
-
-            elif state == self.SWITCH:
-                self.screen.blit(self.switch_images[current], (0, 0))
-                pygame.display.flip()
-
-                waiting = True
-                while waiting:
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                            pygame.quit()
-                            return
-                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                            pygame.quit()
-                            return
-                        elif event.type == pygame.MOUSEBUTTONDOWN:
-                            waiting = False
-                            state = self.PLAYING
-
-            elif state == self.END:
-                self.screen.blit(self.win_images[current], (0, 0))
-                pygame.display.flip()
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        return
-                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                        pygame.quit()
-                        return
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        return self.run()  # restart game
-
-            pygame.display.flip()
-            self.clock.tick(self.fps)
 
+def __getattr__(name):
+    # Interface lives in interface.py so the engine never imports pygame unless the UI is used
+    if name == "Interface":
+        from interface import Interface
+        return Interface
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
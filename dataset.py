@@ -0,0 +1,184 @@
+import json
+import os
+
+import numpy as np
+
+from analytics import iter_batches
+
+INDEX = "index.json"
+VERSION = 1
+
+
+def _column_dtypes(size):
+    cell = np.uint8 if size * size <= 256 else np.uint16
+    return {
+        "winner": np.int8,          # (games,)
+        "strategy": np.uint8,       # (games, 2): strategy id of each player (player i fires at fleet 1 - i)
+        "fleet": np.uint8,          # (games, 2, ships, 3): y, x, vertical of every ship of each fleet
+        "sink_turns": np.int16,     # (games, 2, ships): shot at that fleet that sank the ship, 0 = survived
+        "shot_counts": np.int16,    # (games, 2): shots fired at each fleet
+        "shots": cell,              # (total shots,): every game's shots at fleet 0, then at fleet 1
+        "shot_offsets": np.int64,   # (2 * games + 1,): where each (game, fleet) run starts in shots
+    }
+
+
+# CLASS: DatasetWriter
+class DatasetWriter:
+    """Appends game records to a columnar dataset directory
+
+    Every chunk is a directory of .npy files, one per column; index.json lists the
+    chunks with their game counts plus the board size, fleet and strategy names.
+    Records are buffered and written a chunk at a time, and the index is only
+    rewritten once a chunk is complete, so readers never see half a chunk.
+    """
+
+    def __init__(self, root, ship_list, size=10, chunk_size=1_000_000):
+        self.root = root
+        self.ship_list = [[name, length] for name, length in ship_list]
+        self.size = size
+        self.chunk_size = chunk_size
+        self.dtypes = _column_dtypes(size)
+        path = os.path.join(root, INDEX)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.index = json.load(f)
+            if self.index["size"] != size or self.index["ships"] != self.ship_list:
+                raise ValueError(f"{root} holds games for a different board or fleet.")
+        else:
+            self.index = {"version": VERSION, "size": size, "ships": self.ship_list,
+                          "strategies": [], "games": 0, "chunks": []}
+        self._clear()
+
+    def _clear(self):
+        self._rows = {field: [] for field in ("winner", "strategy", "fleet", "sink_turns", "shot_counts")}
+        self._shots = []
+
+    def add(self, record):
+        strategies = self.index["strategies"]
+        ids = []
+        for name in record["strategies"]:
+            if name not in strategies:
+                strategies.append(name)
+            ids.append(strategies.index(name))
+        sides = record["sides"]
+        rows = self._rows
+        rows["winner"].append(record["winner"])
+        rows["strategy"].append(ids)
+        rows["fleet"].append([[(y, x, direction == 'V') for y, x, direction in side["fleet"]] for side in sides])
+        rows["sink_turns"].append([[t or 0 for t in side["sink_turns"]] for side in sides])
+        rows["shot_counts"].append([len(side["shots"]) for side in sides])
+        for side in sides:
+            self._shots.extend(side["shots"])
+        if len(rows["winner"]) >= self.chunk_size:
+            self.flush()
+
+    def add_records(self, records):
+        for record in records:
+            self.add(record)
+
+    def flush(self):
+        """Write buffered games as a new chunk and update the index"""
+        games = len(self._rows["winner"])
+        if not games:
+            return
+        name = f"chunk_{len(self.index['chunks']):05d}"
+        directory = os.path.join(self.root, name)
+        os.makedirs(directory, exist_ok=True)
+        columns = {field: np.asarray(rows, dtype=self.dtypes[field]) for field, rows in self._rows.items()}
+        columns["shots"] = np.asarray(self._shots, dtype=self.dtypes["shots"])
+        columns["shot_offsets"] = np.concatenate(([0], np.cumsum(columns["shot_counts"].ravel(), dtype=np.int64)))
+        for field, column in columns.items():
+            np.save(os.path.join(directory, field + ".npy"), column)
+        self.index["chunks"].append({"name": name, "games": games, "shots": int(columns["shots"].size)})
+        self.index["games"] += games
+        self._write_index()
+        self._clear()
+
+    def close(self):
+        self.flush()
+        self._write_index()
+
+    def _write_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, INDEX)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_log(log_path, root, ship_list, size=10, chunk_size=1_000_000, batch_size=10000):
+    """Convert a JSON-lines game log into a columnar dataset; returns the number of games"""
+    with DatasetWriter(root, ship_list, size, chunk_size) as writer:
+        before = writer.index["games"]
+        for batch in iter_batches(log_path, batch_size):
+            writer.add_records(batch)
+    return writer.index["games"] - before
+
+
+# CLASS: Dataset
+class Dataset:
+    """Read side of a columnar dataset: columns are memory-mapped chunk by chunk"""
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, INDEX)) as f:
+            self.index = json.load(f)
+        self.size = self.index["size"]
+        self.ship_names = [name for name, _ in self.index["ships"]]
+        self.strategies = self.index["strategies"]
+
+    def __len__(self):
+        return self.index["games"]
+
+    def chunks(self, *fields):
+        """Yield {field: memory-mapped array} for every chunk, opening only the given columns"""
+        for chunk in self.index["chunks"]:
+            directory = os.path.join(self.root, chunk["name"])
+            yield {field: np.load(os.path.join(directory, field + ".npy"), mmap_mode='r') for field in fields}
+
+    def column(self, field):
+        """A whole column across chunks (read into memory)"""
+        parts = [chunk[field] for chunk in self.chunks(field)]
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def mean_sink_turn(self, ship):
+        """Average shots to sink a ship, per strategy of the player firing: {strategy: mean}"""
+        s = self.ship_names.index(ship) if isinstance(ship, str) else ship
+        n = len(self.strategies)
+        totals, counts = np.zeros(n), np.zeros(n)
+        for chunk in self.chunks("sink_turns", "strategy"):
+            turns = np.asarray(chunk["sink_turns"][:, :, s], dtype=np.int64)
+            shooter = np.asarray(chunk["strategy"][:, ::-1])  # fleet i is attacked by player 1 - i
+            sunk = turns > 0
+            totals += np.bincount(shooter[sunk], weights=turns[sunk], minlength=n)
+            counts += np.bincount(shooter[sunk], minlength=n)
+        return {name: float(totals[i] / counts[i]) for i, name in enumerate(self.strategies) if counts[i]}
+
+    def win_rates(self):
+        """Share of seats won by each strategy (a mirror match counts both seats): {strategy: rate}"""
+        n = len(self.strategies)
+        wins, played = np.zeros(n), np.zeros(n)
+        for chunk in self.chunks("winner", "strategy"):
+            strategy = np.asarray(chunk["strategy"])
+            winner = np.asarray(chunk["winner"], dtype=np.intp)
+            wins += np.bincount(strategy[np.arange(len(winner)), winner], minlength=n)
+            played += np.bincount(strategy.ravel(), minlength=n)
+        return {name: float(wins[i] / played[i]) for i, name in enumerate(self.strategies) if played[i]}
+
+    def shots_at(self, game, fleet):
+        """Cells fired at one fleet in a game (global game number)"""
+        for chunk in self.index["chunks"]:
+            if game < chunk["games"]:
+                directory = os.path.join(self.root, chunk["name"])
+                offsets = np.load(os.path.join(directory, "shot_offsets.npy"), mmap_mode='r')
+                shots = np.load(os.path.join(directory, "shots.npy"), mmap_mode='r')
+                return np.array(shots[offsets[2 * game + fleet]:offsets[2 * game + fleet + 1]])
+            game -= chunk["games"]
+        raise IndexError("Game number out of range.")
@@ -0,0 +1,206 @@
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+from rules import CLASSIC_FLEET
+from seeding import game_seed
+from simulation import play_headless_game, write_records
+
+HEADER = struct.Struct('<I')  # payload length; every message is zlib-compressed JSON
+
+
+def send_message(sock, message):
+    payload = zlib.compress(json.dumps(message, separators=(',', ':')).encode('utf-8'))
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    """Next message from sock (raises ConnectionError if the peer went away)"""
+    (length,) = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    return json.loads(zlib.decompress(_recv_exact(sock, length)))
+
+
+def _recv_exact(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed.")
+        data += chunk
+    return bytes(data)
+
+
+# CLASS: Coordinator
+class Coordinator:
+    """Hands out batches of games to TCP workers and collects their records
+
+    Game i of batch b is seeded with game_seed(root_seed, b, i), so a batch gives
+    the same records whichever worker plays it. A batch whose worker disconnects,
+    fails or stays silent for longer than lease_timeout seconds goes back on the
+    queue; a result that arrives for a batch already done is dropped.
+    """
+
+    def __init__(self, path, games, root_seed=0, batch_size=100, ship_list=CLASSIC_FLEET,
+                 shooters=("hunt_target", "hunt_target"), host="127.0.0.1", port=0, lease_timeout=60.0):
+        self.path = path
+        self.root_seed = root_seed
+        self.ship_list = [list(ship) for ship in ship_list]
+        self.shooters = list(shooters)
+        self.lease_timeout = lease_timeout
+        self.batches = {b: min(batch_size, games - start) for b, start in enumerate(range(0, games, batch_size))}
+        self.pending = deque(self.batches)
+        self.done = set()
+        self.requeued = 0
+        self._lock = threading.Condition()
+
+        coordinator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                coordinator._serve(self.request)
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.address = self.server.server_address
+
+    def run(self, timeout=None):
+        """Serve workers until every batch is done; returns True if it finished in time"""
+        thread = threading.Thread(target=self.server.serve_forever, name="coordinator", daemon=True)
+        thread.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while len(self.done) < len(self.batches):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            finished = len(self.done) == len(self.batches)
+            self._lock.notify_all()  # release workers waiting for a batch
+        self.server.shutdown()
+        self.server.server_close()
+        return finished
+
+    def _take(self):
+        # Next batch to hand out, waiting while others are in flight (None once all are done)
+        with self._lock:
+            while not self.pending:
+                if len(self.done) == len(self.batches):
+                    return None
+                self._lock.wait(1.0)
+            return self.pending.popleft()
+
+    def _finish(self, batch, records):
+        with self._lock:
+            if batch in self.done:
+                return
+            write_records(self.path, records)
+            self.done.add(batch)
+            self._lock.notify_all()
+
+    def _requeue(self, batch):
+        with self._lock:
+            if batch not in self.done and batch not in self.pending:
+                self.pending.appendleft(batch)
+                self.requeued += 1
+                self._lock.notify_all()
+
+    def _serve(self, sock):
+        sock.settimeout(self.lease_timeout)
+        batch = None
+        try:
+            while True:
+                message = recv_message(sock)
+                if message.get("type") == "result" and message.get("batch") == batch:
+                    self._finish(batch, message["records"])
+                batch = self._take()
+                if batch is None:
+                    send_message(sock, {"type": "done"})
+                    return
+                send_message(sock, {"type": "batch", "batch": batch, "games": self.batches[batch],
+                                    "seed": self.root_seed, "ship_list": self.ship_list,
+                                    "shooters": self.shooters})
+        except (OSError, ValueError, KeyError, zlib.error):
+            # Covers disconnects, timeouts (socket.timeout is an OSError) and garbled messages
+            pass
+        finally:
+            if batch is not None:
+                self._requeue(batch)
+
+
+def run_worker(host, port, retries=20, retry_delay=0.25):
+    """Play batches from a coordinator until it says everything is done; returns games played"""
+    for attempt in range(retries):
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except ConnectionRefusedError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(retry_delay)
+    played = 0
+    with sock:
+        send_message(sock, {"type": "ready"})
+        while True:
+            message = recv_message(sock)
+            if message["type"] == "done":
+                return played
+            batch = message["batch"]
+            ship_list = [tuple(ship) for ship in message["ship_list"]]
+            records = [play_headless_game(ship_list, seed=game_seed(message["seed"], batch, i),
+                                          shooters=tuple(message["shooters"]))
+                       for i in range(message["games"])]
+            played += len(records)
+            send_message(sock, {"type": "result", "batch": batch, "records": records})
+
+
+def _local_worker(address):
+    run_worker(*address)
+
+
+def run_local(path, games, workers=4, **kwargs):
+    """Coordinator plus worker processes on this machine, e.g. to test a setup; returns the Coordinator"""
+    from multiprocessing import Process
+
+    coordinator = Coordinator(path, games, **kwargs)
+    processes = [Process(target=_local_worker, args=(coordinator.address,), daemon=True) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    coordinator.run()
+    for process in processes:
+        process.join()
+    return coordinator
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Distributed headless simulation")
+    sub = parser.add_subparsers(dest="role", required=True)
+    coord = sub.add_parser("coordinator")
+    coord.add_argument("path")
+    coord.add_argument("games", type=int)
+    coord.add_argument("--seed", type=int, default=0)
+    coord.add_argument("--batch-size", type=int, default=100)
+    coord.add_argument("--host", default="127.0.0.1")
+    coord.add_argument("--port", type=int, default=5007)
+    worker = sub.add_parser("worker")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=5007)
+    args = parser.parse_args()
+
+    if args.role == "coordinator":
+        c = Coordinator(args.path, args.games, args.seed, args.batch_size, host=args.host, port=args.port)
+        print(f"Coordinator listening on {c.address[0]}:{c.address[1]}")
+        start = time.perf_counter()
+        c.run()
+        print(f"{args.games} games in {time.perf_counter() - start:.1f} s ({c.requeued} batches re-queued)")
+    else:
+        print(f"Worker played {run_worker(args.host, args.port)} games")
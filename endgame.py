@@ -0,0 +1,177 @@
+import numpy as np
+from functools import lru_cache
+
+from rules import rule_tables, mask_to_vector
+
+
+def board_masks(guess_board):
+    """Read a guess board into bit masks (misses, open hits, sunk cells)
+
+    Uses the guess board convention from Player.attack: -1 miss, 1 hit, 2 sunk.
+    Bit (y * size + x) stands for cell (y, x).
+    """
+    misses = hits = sunk = 0
+    values = np.asarray(guess_board.grid).ravel()
+    for cell, val in enumerate(values):
+        if val == -1:
+            misses |= 1 << cell
+        elif val == 1:
+            hits |= 1 << cell
+        elif val == 2:
+            sunk |= 1 << cell
+    return misses, hits, sunk
+
+
+def remaining_lengths(ship_list, sunk_names):
+    """Lengths of the ships in ship_list that have not been sunk yet"""
+    sunk_names = list(sunk_names)
+    lengths = []
+    for name, length in ship_list:
+        if name in sunk_names:
+            sunk_names.remove(name)
+        else:
+            lengths.append(length)
+    return lengths
+
+
+def neighbour_masks(size, adjacency='forbidden'):
+    """Mask of each cell together with the cells a ship there may not touch"""
+    return rule_tables(size, adjacency).neighbour_masks
+
+
+def with_neighbours(mask, size, adjacency='forbidden'):
+    """Grow a cell mask by the cells a ship may not touch"""
+    return rule_tables(size, adjacency).with_neighbours(mask)
+
+
+def placement_masks(size, length, adjacency='forbidden'):
+    """Every in-bounds placement of a ship: (cell masks, halo masks, cell matrix)"""
+    return rule_tables(size, adjacency).placements(length)
+
+
+def halo_matrix(size, length, adjacency='forbidden'):
+    """Halo (cells plus neighbours) of every placement as a 0/1 matrix"""
+    return rule_tables(size, adjacency).halo_matrix(length)
+
+
+def placement_density(misses, hits, sunk, lengths, size=10, hit_weight=20.0, adjacency='forbidden'):
+    """Heuristic shot scores from counting each remaining ship's placements on its own
+
+    Placements that overlap a miss, touch a sunk ship, or touch an open hit without
+    covering it, are dropped. Placements covering k open hits count hit_weight ** k times.
+    Returns a flat array of size*size scores (fired cells score zero).
+    """
+    n = size * size
+    tables = rule_tables(size, adjacency)
+    blocked = mask_to_vector(misses | tables.with_neighbours(sunk), size)
+    hit_vec = mask_to_vector(hits, size)
+    density = np.zeros(n)
+    for length in lengths:
+        matrix = tables.placements(length)[2]
+        covered = matrix @ hit_vec
+        ok = (matrix @ blocked == 0) & (tables.halo_matrix(length) @ hit_vec == covered)
+        weights = np.where(ok, hit_weight ** covered, 0.0)
+        density += weights @ matrix
+    density[mask_to_vector(misses | hits | sunk, size).astype(bool)] = 0
+    return density
+
+
+# CLASS: EndgameSolver
+class EndgameSolver:
+    """Exact hit probabilities by enumerating every consistent placement of the remaining ships"""
+
+    def __init__(self, size=10, cache_size=4096, adjacency='forbidden'):
+        self.size = size
+        self.tables = rule_tables(size, adjacency)
+        # Memo of sub-problems keyed by board state, shared by every solve on this solver
+        self._count = lru_cache(maxsize=cache_size)(self._count_uncached)
+        self._candidates = lru_cache(maxsize=cache_size)(self._candidates_uncached)
+        self._solve = lru_cache(maxsize=cache_size)(self._solve_uncached)
+
+    def probabilities(self, guess_board, lengths):
+        """Per-cell probability (size x size array) that each cell holds a remaining ship"""
+        misses, hits, sunk = board_masks(guess_board)
+        return self.probabilities_from_masks(misses, hits, sunk, lengths)
+
+    def probabilities_from_masks(self, misses, hits, sunk, lengths):
+        count, cells = self._solve(misses, hits, sunk, tuple(sorted(lengths, reverse=True)))
+        if count == 0:
+            return np.zeros((self.size, self.size))
+        return (cells / count).reshape(self.size, self.size)
+
+    def count_layouts(self, misses, hits, sunk, lengths):
+        """Number of placements of the remaining ships consistent with the board"""
+        return self._solve(misses, hits, sunk, tuple(sorted(lengths, reverse=True)))[0]
+
+    def best_shot(self, guess_board, lengths):
+        """Unfired cell with the highest hit probability (returns (y, x) or None)"""
+        misses, hits, sunk = board_masks(guess_board)
+        probs = self.probabilities_from_masks(misses, hits, sunk, lengths).ravel().copy()
+        fired = mask_to_vector(misses | hits | sunk, self.size).astype(bool)
+        if fired.all():
+            return None
+        probs[fired] = -1
+        return divmod(int(np.argmax(probs)), self.size)
+
+    def _solve_uncached(self, misses, hits, sunk, lengths):
+        n = self.size * self.size
+        if not lengths:
+            return (1 if hits == 0 else 0), np.zeros(n)
+
+        # Propagate the fixed constraints: nothing on a miss, a sunk ship or next to a sunk ship
+        forbidden = misses | self.tables.with_neighbours(sunk)
+        if bin(hits).count('1') > sum(lengths):
+            return 0, np.zeros(n)
+
+        # Every open hit must be reachable by at least one candidate placement
+        reach = 0
+        for length in set(lengths):
+            for m in self._candidates(length, forbidden)[0]:
+                reach |= m
+        if hits & ~reach:
+            return 0, np.zeros(n)
+
+        return self._count(lengths, forbidden, 0, hits, 0)
+
+    def _candidates_uncached(self, length, forbidden):
+        """Placements of one ship length that avoid the forbidden cells"""
+        cells, halos, matrix = self.tables.placements(length)
+        keep = [i for i, m in enumerate(cells) if not m & forbidden]
+        return [cells[i] for i in keep], [halos[i] for i in keep], matrix[keep]
+
+    def _count_uncached(self, lengths, forbidden, blocked, uncovered, start):
+        """(layouts, per-cell counts) for ships lengths[...] avoiding blocked and covering uncovered
+
+        Ships of equal length are placed in increasing candidate order (start) so each
+        layout is counted once.
+        """
+        length = lengths[0]
+        cells, halos, matrix = self._candidates(length, forbidden)
+
+        if len(lengths) == 1:
+            # Last ship: check every candidate at once
+            ok = matrix[start:] @ mask_to_vector(blocked, self.size) == 0
+            if uncovered:
+                need = mask_to_vector(uncovered, self.size)
+                ok &= matrix[start:] @ need == need.sum()
+            ok = ok.astype(np.float64)
+            return int(ok.sum()), ok @ matrix[start:]
+
+        rest = lengths[1:]
+        remaining = sum(rest)
+        total = 0
+        cell_counts = np.zeros(self.size * self.size)
+        for i in range(start, len(cells)):
+            m = cells[i]
+            if m & blocked:
+                continue
+            left = uncovered & ~m
+            if bin(left).count('1') > remaining:
+                continue
+            next_start = i + 1 if rest[0] == length else 0
+            count, sub_cells = self._count(rest, forbidden, blocked | halos[i], left, next_start)
+            if count:
+                total += count
+                cell_counts += sub_cells
+                cell_counts += count * matrix[i]
+        return total, cell_counts
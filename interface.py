@@ -0,0 +1,625 @@
+import time
+
+import numpy as np
+import pygame
+
+from classes import Ship, Player, Game, PlacementHistory
+
+
+# CLASS: Viewport
+class Viewport:
+    """A scrollable, zoomable window onto a board
+
+    The board is laid out in board pixels (one cell = tile + margin at zoom 1) and the
+    viewport shows the part of it that starts at (scroll_x, scroll_y), scaled by zoom,
+    inside a fixed screen rectangle. Clicks and hovers are mapped back through the
+    same transform.
+    """
+
+    def __init__(self, origin, width, height, board_size, tile_size=40, margin=4, min_pitch=1):
+        self.rect = pygame.Rect(origin[0], origin[1], width, height)
+        self.board_size = board_size
+        self.tile_size, self.margin = tile_size, margin
+        self.zoom = 1.0
+        self.scroll_x = self.scroll_y = 0.0
+        # Never zoom out below min_pitch px per cell, nor further than needed to show the whole board
+        fit = min(width, height) / board_size
+        self.min_zoom = min(1.0, max(min_pitch, fit) / (tile_size + margin))
+        self.max_zoom = 2.0
+
+    @property
+    def key(self):
+        """What the drawn picture depends on: (scroll_x, scroll_y, zoom)"""
+        return self.scroll_x, self.scroll_y, self.zoom
+
+    @property
+    def pitch(self):
+        """Screen pixels from one cell to the next"""
+        return (self.tile_size + self.margin) * self.zoom
+
+    def clamp(self):
+        """Keep the board covering the viewport where it can"""
+        extent = self.board_size * self.pitch
+        self.scroll_x = min(max(self.scroll_x, 0.0), max(0.0, extent - self.rect.width))
+        self.scroll_y = min(max(self.scroll_y, 0.0), max(0.0, extent - self.rect.height))
+
+    def scroll_by(self, dx, dy):
+        self.scroll_x += dx
+        self.scroll_y += dy
+        self.clamp()
+
+    def zoom_at(self, pos, factor):
+        """Zoom by factor, keeping the board point under the screen position pos still"""
+        zoom = min(max(self.zoom * factor, self.min_zoom), self.max_zoom)
+        px, py = pos[0] - self.rect.x, pos[1] - self.rect.y
+        self.scroll_x = (self.scroll_x + px) * zoom / self.zoom - px
+        self.scroll_y = (self.scroll_y + py) * zoom / self.zoom - py
+        self.zoom = zoom
+        self.clamp()
+
+    def cell_at(self, pos):
+        """Board cell (row, col) under a screen position, or None"""
+        if not self.rect.collidepoint(pos):
+            return None
+        col = int((pos[0] - self.rect.x + self.scroll_x) // self.pitch)
+        row = int((pos[1] - self.rect.y + self.scroll_y) // self.pitch)
+        if 0 <= row < self.board_size and 0 <= col < self.board_size:
+            return row, col
+        return None
+
+    def visible_cells(self):
+        """(first row, end row, first col, end col) of the cells that reach into the viewport"""
+        pitch = self.pitch
+        c0, r0 = int(self.scroll_x // pitch), int(self.scroll_y // pitch)
+        c1 = min(self.board_size, int((self.scroll_x + self.rect.width) // pitch) + 1)
+        r1 = min(self.board_size, int((self.scroll_y + self.rect.height) // pitch) + 1)
+        return r0, r1, c0, c1
+
+    def cell_origin(self, row, col):
+        """Screen position of the top-left corner of a cell"""
+        return (self.rect.x + col * self.pitch - self.scroll_x,
+                self.rect.y + row * self.pitch - self.scroll_y)
+
+
+# CLASS: Interface
+class Interface:
+    def __init__(self, log=None, rules=None, scoreboard=None):
+        pygame.init()
+        self.log = log  # optional wal.GameLog: moves are logged and an unfinished match resumes on start
+        self.rules = rules  # board size, fleet etc. (None: classic rules)
+        self.scoreboard = scoreboard  # optional scoreboard.Scoreboard that every won game is recorded on
+
+        # Constants
+        self.tile_size, self.margin = 40, 4
+        self.fps = 30
+
+        # Event-driven rendering: block on input instead of redrawing every frame, and only
+        # tick at self.fps while something is animating
+        self.event_driven = True
+        self.idle_timeout_ms = 1000
+        self.banner = None  # (text, colour, until_ms, next_state) shown over the boards
+        self.pending = []   # events taken off the queue while waiting, handled before the rest of the queue
+
+        # Colours
+        self.white = (255, 255, 255)
+        self.blue = (0, 0, 128)
+        self.green = (0, 200, 0)
+        self.red = (200, 0, 0)
+        self.grey = (150, 150, 150)
+        self.black = (0, 0, 0)
+
+        # Load images
+        self.loading_bg = pygame.image.load("images/loading_screen.png")
+        self.wnd_width, self.wnd_height = self.loading_bg.get_width(), self.loading_bg.get_height()
+        self.screen = pygame.display.set_mode((self.wnd_width, self.wnd_height))
+        pygame.display.set_caption("Batalla Naval")
+        self.clock = pygame.time.Clock()
+
+        self.font = pygame.font.SysFont("arial", 24)
+        self.big_font = pygame.font.SysFont("arial", 48)
+
+        self.button_images = {
+            "p1_manual": pygame.image.load("images/btn_manual.png"),
+            "p1_random": pygame.image.load("images/btn_random.png"),
+            "p2_manual": pygame.image.load("images/btn_manual.png"),
+            "p2_random": pygame.image.load("images/btn_random.png"),
+        }
+
+        self.button_hover_images = {
+            "p1_manual": pygame.image.load("images/btn_manual_hover.png"),
+            "p1_random": pygame.image.load("images/btn_random_hover.png"),
+            "p2_manual": pygame.image.load("images/btn_manual_hover.png"),
+            "p2_random": pygame.image.load("images/btn_random_hover.png"),
+        }
+
+        self.selected_buttons = {
+            "p1_manual": False,
+            "p1_random": False,
+            "p2_manual": False,
+            "p2_random": False,
+        }
+
+        self.switch_images = {
+            "p1": pygame.image.load("images/switch_p1.png"),
+            "p2": pygame.image.load("images/switch_p2.png"),
+        }
+
+        self.win_images = {
+            "p1": pygame.image.load("images/win_p1.png"),
+            "p2": pygame.image.load("images/win_p2.png"),
+        }
+
+        button_width, button_height = 180, 50
+        self.menu_buttons = {
+            "p1_manual": pygame.Rect(100, 250, button_width, button_height),
+            "p1_random": pygame.Rect(100, 330, button_width, button_height),
+            "p2_manual": pygame.Rect(744, 250, button_width, button_height),
+            "p2_random": pygame.Rect(744, 330, button_width, button_height),
+        }
+
+        # Where the boards are drawn in each state; each gets a Viewport once the board size is known
+        self.placement_origin = (320, 150)
+        self.fleet_origin = (50, 150)
+        self.shots_origin = (550, 150)
+        self.view_size = 10 * (self.tile_size + self.margin) - self.margin  # a classic board fits exactly
+        self.viewports = {}
+        # Below this many pixels per cell, boards are drawn as one scaled image instead of tile by tile
+        self.lod_pitch = 8
+        self.scroll_step = 44
+
+        # Game states
+        self.MENU = "menu"
+        self.PLACEMENT = "placement"
+        self.PLAYING = "playing"
+        self.SWITCH = "switch"
+        self.END = "end"
+
+    def draw_text(self, surface, text, x, y, size=24, colour=None):
+        if colour is None:
+            colour = self.white
+        f = pygame.font.SysFont("arial", size)
+        t = f.render(text, True, colour)
+        surface.blit(t, (x, y))
+
+    def draw_button_image(self, key, rect, mouse_pos):
+        if rect.collidepoint(mouse_pos) or self.selected_buttons[key]:
+            img = pygame.transform.scale(self.button_hover_images[key], (rect.width, rect.height))
+        else:
+            img = pygame.transform.scale(self.button_images[key], (rect.width, rect.height))
+        self.screen.blit(img, rect.topleft)
+
+    def make_viewports(self, board_size):
+        self.viewports = {
+            name: Viewport(origin, self.view_size, self.view_size, board_size, self.tile_size, self.margin)
+            for name, origin in (("placement", self.placement_origin), ("fleet", self.fleet_origin),
+                                 ("shots", self.shots_origin))
+        }
+
+    def cell_colours(self, cells, reveal, is_guess):
+        """RGB array for an array of grid values"""
+        if is_guess:
+            palette = [self.grey, self.blue, self.red, self.red]  # miss, untried, hit, sunk
+        else:
+            palette = [self.grey, self.blue, self.green if reveal else self.blue, self.red]  # values -1, 0, 1, 2
+        palette = np.array(palette, dtype=np.uint8)
+        return palette[cells.astype(np.intp) + 1]
+
+    def draw_board(self, board, viewport, reveal=False, is_guess=False):
+        """Draw the part of a board inside its viewport"""
+        r0, r1, c0, c1 = viewport.visible_cells()
+        if r0 >= r1 or c0 >= c1:
+            return
+        pitch = viewport.pitch
+        self.screen.set_clip(viewport.rect)
+        x0, y0 = viewport.cell_origin(r0, c0)
+
+        if pitch < self.lod_pitch:
+            # Zoomed out: one pixel per visible cell, scaled up in a single blit
+            pixels = self.cell_colours(board.grid[r0:r1, c0:c1], reveal, is_guess)
+            image = pygame.surfarray.make_surface(pixels.swapaxes(0, 1))
+            size = (round((c1 - c0) * pitch), round((r1 - r0) * pitch))
+            self.screen.blit(pygame.transform.scale(image, size), (round(x0), round(y0)))
+        else:
+            colours = self.cell_colours(board.grid[r0:r1, c0:c1], reveal, is_guess).tolist()
+            tile = max(1, round(self.tile_size * viewport.zoom))
+            border = 2 if tile >= 16 else 0
+            for i, row in enumerate(colours):
+                y = round(y0 + i * pitch)
+                for j, colour in enumerate(row):
+                    rect = pygame.Rect(round(x0 + j * pitch), y, tile, tile)
+                    pygame.draw.rect(self.screen, colour, rect)
+                    if border:
+                        pygame.draw.rect(self.screen, self.white, rect, border)
+        self.screen.set_clip(None)
+
+    def draw_ghost(self, viewport, length, direction, valid):
+        """Translucent preview of the ship being placed at the hovered cell, green if it fits"""
+        cell = viewport.cell_at(pygame.mouse.get_pos())
+        if cell is None:
+            return
+        gy, gx = cell
+        colour = (0, 200, 0, 110) if valid[direction][gy, gx] else (200, 0, 0, 110)
+        tile = max(1, round(self.tile_size * viewport.zoom))
+        ghost = pygame.Surface((tile, tile), pygame.SRCALPHA)
+        ghost.fill(colour)
+        self.screen.set_clip(viewport.rect)
+        for i in range(length):
+            y, x = (gy + i, gx) if direction == "V" else (gy, gx + i)
+            if y >= viewport.board_size or x >= viewport.board_size:
+                break
+            px, py = viewport.cell_origin(y, x)
+            self.screen.blit(ghost, (round(px), round(py)))
+        self.screen.set_clip(None)
+
+    def draw_marks(self, viewport, cells):
+        """Translucent markers on the cells picked for a salvo that has not been fired yet"""
+        tile = max(1, round(self.tile_size * viewport.zoom))
+        mark = pygame.Surface((tile, tile), pygame.SRCALPHA)
+        mark.fill((255, 200, 0, 140))
+        self.screen.set_clip(viewport.rect)
+        for y, x in cells:
+            px, py = viewport.cell_origin(y, x)
+            self.screen.blit(mark, (round(px), round(py)))
+        self.screen.set_clip(None)
+
+    def handle_view_event(self, event, names):
+        """Scroll (arrow keys, right-drag) or zoom (wheel) the viewport under the mouse; True if used"""
+        mouse = pygame.mouse.get_pos()
+        viewport = next((self.viewports[name] for name in names
+                         if self.viewports[name].rect.collidepoint(mouse)), None)
+        if viewport is None:
+            return False
+        if event.type == pygame.MOUSEWHEEL:
+            viewport.zoom_at(mouse, 1.25 ** event.y)
+            return True
+        if event.type == pygame.MOUSEMOTION and event.buttons[2]:
+            viewport.scroll_by(-event.rel[0], -event.rel[1])
+            return True
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+            dx = (event.key == pygame.K_RIGHT) - (event.key == pygame.K_LEFT)
+            dy = (event.key == pygame.K_DOWN) - (event.key == pygame.K_UP)
+            viewport.scroll_by(dx * self.scroll_step, dy * self.scroll_step)
+            return True
+        return False
+
+    def log_move(self, kind, *args):
+        """Append a record (a wal.GameLog method name plus its arguments) if a log is attached"""
+        if self.log is not None:
+            getattr(self.log, kind)(*args)
+
+    def log_fleet(self, seat, board):
+        for i, ship in enumerate(board.ships):
+            self.log_move("place", seat, i, ship)
+
+    def hover_target(self, state, pos):
+        """What the mouse is over, as far as drawing is concerned"""
+        if state == self.MENU:
+            return next((key for key, rect in self.menu_buttons.items() if rect.collidepoint(pos)), None)
+        if state == self.PLACEMENT:
+            return self.viewports["placement"].cell_at(pos)
+        if state == self.PLAYING:
+            return self.viewports["shots"].cell_at(pos)
+        return None
+
+    def animating(self):
+        return self.banner is not None
+
+    def show_banner(self, text, colour, duration_ms, next_state=None):
+        """Show a message over the boards for a while, then optionally move to next_state"""
+        self.banner = (text, colour, pygame.time.get_ticks() + duration_ms, next_state)
+
+    def wait_for_change(self, view, last_view, last_hover):
+        """Sleep until something would change the picture
+
+        Returns (redraw, hover). Mouse motion that stays over the same target is
+        dropped; any other event is kept for next_events(), ahead of whatever queued
+        up behind it.
+        """
+        state = view[0]
+        if view != last_view:
+            return True, self.hover_target(state, pygame.mouse.get_pos())
+        event = pygame.event.wait(self.idle_timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return False, last_hover
+        if event.type == pygame.MOUSEMOTION and not event.buttons[2]:
+            hover = self.hover_target(state, event.pos)
+            return hover != last_hover, hover
+        self.pending.append(event)
+        return True, last_hover
+
+    def next_events(self):
+        """Events for the state code, in the order they happened"""
+        events, self.pending = self.pending, []
+        return events + pygame.event.get()
+
+    def run(self):
+        state = self.MENU
+        game = Game(rules=self.rules)
+        self.make_viewports(game.rules.size)
+        player_modes = {"p1": None, "p2": None}
+        players = {"p1": None, "p2": None}
+        current = None
+        opponent = None
+        current_ship_idx = 0
+        placing_dir = "H"
+        preview, preview_key = None, None  # valid start cells for the ship being placed
+        histories = {}  # per player: undo/redo of manual placements
+        shots_taken = 0  # shots fired so far this turn
+        salvo = []       # salvo rules: cells picked this turn, fired together once there is one per ship afloat
+        started = None   # time.monotonic() when the first turn was shown, for the scoreboard
+        last_view = None
+        hover = None
+        self.banner = None
+        self.pending = []
+        seats = {"p1": 0, "p2": 1}
+
+        # Pick up an unfinished match from the log where it stopped
+        game.log = self.log
+        resumed = game.resume(complete_fleets=False)
+        if resumed is not None:
+            players = {"p1": game.players[0], "p2": game.players[1]}
+            unplaced = [key for key in ("p1", "p2") if len(players[key].board.ships) < len(game.ships_to_place)]
+            if unplaced:
+                # The rest of an unfinished fleet is placed by hand
+                state, current = self.PLACEMENT, unplaced[0]
+                current_ship_idx = len(players[current].board.ships)
+                player_modes = {key: "manual" if key in unplaced else "random" for key in players}
+            else:
+                seat, taken = resumed
+                current, opponent = ("p1", "p2") if seat == 0 else ("p2", "p1")
+                state = self.PLAYING
+                if taken and (game.rules.salvo or taken >= game.rules.shots_per_turn):
+                    # The shots of this turn were all fired: hand over
+                    current, opponent = opponent, current
+                    self.log_move("turn", seats[current])
+                    state = self.SWITCH
+                else:
+                    shots_taken = taken
+
+        while True:
+            if self.banner is not None and pygame.time.get_ticks() >= self.banner[2]:
+                next_state = self.banner[3]
+                self.banner = None
+                last_view = None  # the banner has to be wiped off the screen
+                if next_state == self.SWITCH:
+                    current, opponent = opponent, current
+                    shots_taken = 0
+                    self.log_move("turn", seats[current])
+                if next_state is not None:
+                    state = next_state
+
+            if self.event_driven and not self.animating():
+                # Scrolling and zooming happen after a frame is drawn, so they are part of what needs a redraw
+                view = (state, current, current_ship_idx, placing_dir, shots_taken, tuple(salvo),
+                        tuple(viewport.key for viewport in self.viewports.values()))
+                redraw, hover = self.wait_for_change(view, last_view, hover)
+                last_view = view
+                if not redraw:
+                    continue
+
+            self.screen.fill(self.black)
+
+            if state == self.MENU:
+                self.screen.blit(self.loading_bg, (0, 0))
+                self.draw_text(self.screen, "Left: Player 1   |   Right: Player 2", 400, 650)
+
+                buttons = self.menu_buttons
+
+                mouse_pos = pygame.mouse.get_pos()
+                for key, rect in buttons.items():
+                    self.draw_button_image(key, rect, mouse_pos)
+
+                for event in self.next_events():
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        return
+                    elif event.type == pygame.MOUSEBUTTONDOWN:
+                        for key, rect in buttons.items():
+                            if rect.collidepoint(event.pos):
+                                pkey, mode = key.split("_")
+                                player_modes[pkey] = mode
+                                for k in buttons:
+                                    if k.startswith(pkey):
+                                        self.selected_buttons[k] = (k == key)
+
+                                if all(player_modes.values()):
+                                    # Create player objects once modes selected
+                                    players["p1"] = Player("Player 1", game.rules)
+                                    players["p2"] = Player("Player 2", game.rules)
+                                    self.log_move("start", ["Player 1", "Player 2"], game.rules)
+
+                                    # Handle Player 1 placement
+                                    if player_modes["p1"] == "random":
+                                        players["p1"].board.place_fleet_random(game.ships_to_place)
+                                        self.log_fleet(0, players["p1"].board)
+                                        # Player 2 placement or start play
+                                        if player_modes["p2"] == "random":
+                                            players["p2"].board.place_fleet_random(game.ships_to_place)
+                                            self.log_fleet(1, players["p2"].board)
+                                            state = self.PLAYING
+                                            current = "p1"
+                                            opponent = "p2"
+                                        else:
+                                            state = self.PLACEMENT
+                                            current = "p2"
+                                            current_ship_idx = 0
+                                    else:
+                                        state = self.PLACEMENT
+                                        current = "p1"
+                                        current_ship_idx = 0
+
+            elif state == self.PLACEMENT:
+                player = players[current]
+                ships = game.ships_to_place
+
+                if current_ship_idx >= len(ships):
+                    # Finished current player's placement
+                    p2_board = players["p2"].board
+                    if current == "p1" and len(p2_board.ships) < len(ships):
+                        if player_modes["p2"] == "random" and not p2_board.ships:
+                            p2_board.place_fleet_random(game.ships_to_place)
+                            self.log_fleet(1, p2_board)
+                            state = self.PLAYING
+                            current = "p1"
+                            opponent = "p2"
+                        else:
+                            # Manual, or a resumed fleet that is partly down: carry on from its next ship
+                            current = "p2"
+                            current_ship_idx = len(p2_board.ships)
+                    else:
+                        state = self.PLAYING
+                        current = "p1"
+                        opponent = "p2"
+                else:
+                    ship_name, ship_len = ships[current_ship_idx]
+                    self.draw_text(self.screen, f"{player.name}: Place {ship_name} (size {ship_len})", 335, 40, 30)
+                    self.draw_text(self.screen, f"Press R to rotate ({placing_dir}), U to undo, Y to redo", 360, 80, 24)
+                    history = histories.get(current)
+                    if history is None:
+                        # Built once per player: it snapshots the board's blocked cells
+                        history = histories[current] = PlacementHistory(player.board)
+                    self.draw_board(player.board, self.viewports["placement"], reveal=True)
+                    # Valid start cells only change when a ship is placed, so hovering is a lookup
+                    if preview_key != (current, current_ship_idx):
+                        preview, preview_key = player.board.valid_starts(ship_len), (current, current_ship_idx)
+                    self.draw_ghost(self.viewports["placement"], ship_len, placing_dir, preview)
+                    for event in self.next_events():
+                        if self.handle_view_event(event, ("placement",)):
+                            continue
+                        if event.type == pygame.QUIT:
+                            pygame.quit()
+                            return
+                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                            pygame.quit()
+                            return
+                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                            placing_dir = "V" if placing_dir == "H" else "H"
+                        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_u, pygame.K_z):
+                            if history.undo() is not None:
+                                current_ship_idx -= 1
+                                self.log_move("unplace", seats[current])
+                        elif event.type == pygame.KEYDOWN and event.key == pygame.K_y:
+                            ship = history.redo()
+                            if ship is not None:
+                                self.log_move("place", seats[current], current_ship_idx, ship)
+                                current_ship_idx += 1
+                        elif event.type == pygame.MOUSEBUTTONDOWN:
+                            cell = self.viewports["placement"].cell_at(event.pos)
+                            if cell is not None and event.button == 1 and preview[placing_dir][cell]:
+                                ship = Ship(ship_name, ship_len)
+                                success, _ = history.place(ship, cell, placing_dir)
+                                if success:
+                                    self.log_move("place", seats[current], current_ship_idx, ship)
+                                    current_ship_idx += 1
+
+            elif state == self.PLAYING:
+                attacker = players[current]
+                defender = players[opponent]
+                if started is None:
+                    started = time.monotonic()
+                # Shots this turn, as Game.play counts them: one per ship afloat under salvo rules
+                size = attacker.guess_board.size
+                allowed = attacker.board.ships_afloat() if game.rules.salvo else game.rules.shots_per_turn
+                allowed = min(allowed, size * size - bin(attacker.shots).count('1'))
+                self.draw_text(self.screen, f"{attacker.name}'s Turn", 400, 40, 36)
+                if game.rules.salvo:
+                    self.draw_text(self.screen, f"Salvo: {len(salvo)} of {allowed} targets picked", 400, 80)
+                elif allowed > 1:
+                    self.draw_text(self.screen, f"Shot {shots_taken + 1} of {allowed}", 400, 80)
+                self.draw_text(self.screen, "Your Fleet", 50, 100)
+                self.draw_text(self.screen, "Your Shots", 550, 100)
+                self.draw_board(attacker.board, self.viewports["fleet"], reveal=True)
+                self.draw_board(attacker.guess_board, self.viewports["shots"], is_guess=True)
+                self.draw_marks(self.viewports["shots"], salvo)
+                if self.banner is not None:
+                    self.draw_text(self.screen, self.banner[0], 400, 635, 30, self.banner[1])
+
+                for event in self.next_events():
+                    if self.handle_view_event(event, ("fleet", "shots")):
+                        continue
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        return
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        pygame.quit()
+                        return
+                    elif event.type == pygame.MOUSEBUTTONDOWN and (self.banner is None or self.banner[3] is None):
+                        cell = self.viewports["shots"].cell_at(event.pos)
+                        if cell is not None and event.button == 1:
+                            gy, gx = cell
+                            if attacker.has_shot(gy, gx):
+                                # Repeat shot: keep the turn and ask for another cell
+                                self.show_banner("You already shot here!", self.white, 500)
+                                continue
+
+                            if game.rules.salvo:
+                                # Pick (or drop) targets until there is one per ship afloat, then fire them together
+                                if cell in salvo:
+                                    salvo.remove(cell)
+                                    continue
+                                salvo.append(cell)
+                                if len(salvo) < allowed:
+                                    continue
+                                cells = [y * size + x for y, x in salvo]
+                                salvo = []
+                                results, sunk = attacker.fire_salvo(defender, cells)
+                                self.log_move("shots", seats[current], cells)
+                                hits = sum(result is not None for result in results)
+                                result_message = f"{hits} HIT{'' if hits == 1 else 'S'}!" if hits else "All missed!"
+                                if sunk:
+                                    result_message = f"You sank {', '.join(ship.name for ship in sunk)}!"
+                                turn_over = True
+                            else:
+                                result = attacker.fire(defender, gy, gx)
+                                self.log_move("shots", seats[current], [gy * size + gx])
+                                shots_taken += 1
+                                if isinstance(result, Ship):
+                                    result_message = "HIT!"
+                                    if result.is_sunk():
+                                        result_message = f"You sank {defender.name}'s {result.name}!"
+                                else:
+                                    result_message = "Miss!"
+                                turn_over = shots_taken >= allowed
+
+                            # Show the result for a second, then hand over once the turn's shots are used (or finish)
+                            colour = self.green if "HIT" in result_message or "sank" in result_message else self.white
+                            if defender.all_sunk():
+                                next_state = self.END
+                            else:
+                                next_state = self.SWITCH if turn_over else None
+                            if next_state == self.END:
+                                self.log_move("finish", seats[current])
+                                if self.scoreboard is not None:
+                                    self.scoreboard.record_game(players["p1"].name, players["p2"].name, attacker.name,
+                                                                bin(attacker.shots).count('1'),
+                                                                time.monotonic() - started)
+                            self.show_banner(result_message, colour, 1000, next_state)
+
+            elif state == self.SWITCH:
+                self.screen.blit(self.switch_images[current], (0, 0))
+                for event in self.next_events():
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        return
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        pygame.quit()
+                        return
+                    elif event.type == pygame.MOUSEBUTTONDOWN:
+                        state = self.PLAYING
+
+            elif state == self.END:
+                self.screen.blit(self.win_images[current], (0, 0))
+                for event in self.next_events():
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        return
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        pygame.quit()
+                        return
+                    elif event.type == pygame.MOUSEBUTTONDOWN:
+                        return self.run()  # restart game
+
+            pygame.display.flip()
+            if not self.event_driven or self.animating():
+                self.clock.tick(self.fps)
+
@@ -0,0 +1,192 @@
+import math
+import os
+import pickle
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+from classes import Ship
+from rules import CLASSIC_RULES
+from seeding import shared_rng
+
+MAGIC = b'BNLC'
+
+
+def random_below(rng, n):
+    """Exactly uniform integer in [0, n) for arbitrarily large n, from a NumPy Generator"""
+    bits = n.bit_length()
+    nbytes = (bits + 7) // 8
+    while True:
+        r = int.from_bytes(rng.bytes(nbytes), 'little') >> (8 * nbytes - bits)
+        if r < n:
+            return r
+
+
+# CLASS: LayoutCounter
+class LayoutCounter:
+    """Exact number of legal fleet layouts for a rule set, and uniform sampling from them
+
+    The board is filled one row at a time. Between two rows the state is the set of
+    cells in the next row that a new ship may not use (because they touch the row
+    above), the cells still owed by vertical ships crossing into the next row, and
+    how many ships of each length are left. The number of ways to finish the board
+    from each state is memoised (a state and its mirror image share one entry), so
+    sampling can pick every row's filling with probability proportional to the
+    layouts it leads to.
+    """
+
+    def __init__(self, rules=None, path=None, cache_size=1024):
+        rules = rules if rules is not None else CLASSIC_RULES
+        self.size = rules.size
+        self.adjacency = rules.adjacency
+        self.fleet = rules.fleet
+        self.lengths = tuple(sorted({length for _, length in self.fleet}))
+        self.start_counts = tuple(sum(1 for _, l in self.fleet if l == length) for length in self.lengths)
+        # The DP treats ships of equal length as identical; telling them apart multiplies the count
+        self.labellings = math.prod(math.factorial(n) for n in self.start_counts)
+        if path is None:
+            lengths = "-".join(str(length) for _, length in self.fleet)
+            path = os.path.join("counts", f"counts_{self.size}x{self.size}_{self.adjacency}_{lengths}.pkl")
+        self.path = path
+        self._memo = None  # (rows left, blocked cells, vertical cells owed, ships left) -> ways; loaded lazily
+        # Row fillings with their cumulative weights, kept for the states sampling visits most (the first row always)
+        self._options = lru_cache(maxsize=cache_size)(self._options_uncached)
+
+    def count(self):
+        """Number of legal layouts of the named fleet"""
+        return self.count_unlabelled() * self.labellings
+
+    def count_unlabelled(self):
+        """Number of legal layouts when ships of equal length are interchangeable"""
+        if self._memo is None:
+            self.load()
+        return self._ways(self.size, 0, (0,) * self.size, self.start_counts)
+
+    def sample(self, rng=None):
+        """A uniformly random legal layout: [(y, x, direction)] in fleet order"""
+        if rng is None:
+            rng = shared_rng()
+        if not self.count_unlabelled():
+            raise ValueError("The fleet cannot be placed on this board.")
+        placed = {length: [] for length in self.lengths}
+        state = (0, (0,) * self.size, self.start_counts)
+        for y in range(self.size):
+            fillings, cumulative = self._options(self.size - y, *state)
+            ships, nxt = fillings[bisect_right(cumulative, random_below(rng, cumulative[-1]))]
+            for x, length, vertical in ships:
+                placed[length].append((y, x, 'V' if vertical else 'H'))
+            state = nxt
+        # Hand the placements of each length to the named ships in random order
+        for length, starts in placed.items():
+            placed[length] = [starts[i] for i in rng.permutation(len(starts))]
+        return [placed[length].pop() for _, length in self.fleet]
+
+    def place(self, board, rng=None):
+        """Place the whole fleet on board as a uniformly random legal layout (drawn with board.rng by default)"""
+        layout = self.sample(rng if rng is not None else board.rng)
+        for (name, length), (y, x, direction) in zip(self.fleet, layout):
+            ship = Ship(name, length)
+            ship.place((y, x), direction, board)
+            board.add_ship(ship)
+
+    def load(self):
+        """Read the memoised counts from disk, computing and saving them first if the file is missing"""
+        if not os.path.exists(self.path):
+            self._memo = {}
+            self.count_unlabelled()
+            self.save()
+            return
+        with open(self.path, 'rb') as f:
+            magic, key, memo = pickle.load(f)
+        if magic != MAGIC or key != self._key():
+            raise ValueError(f"{self.path} does not hold layout counts for these rules.")
+        self._memo = memo
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a partial table behind
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((MAGIC, self._key(), self._memo), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+
+    def _options_uncached(self, rows_left, blocked, owed, left):
+        fillings = self._fillings(rows_left, blocked, owed, left)
+        cumulative = list(accumulate(self._ways(rows_left - 1, *nxt) for _, nxt in fillings))
+        return fillings, cumulative
+
+    def _key(self):
+        return self.size, self.adjacency, self.lengths, self.start_counts
+
+    def _ways(self, rows_left, blocked, owed, left):
+        """Ways to fill the last rows_left rows from a state"""
+        mirrored = int(f"{blocked:0{self.size}b}"[::-1], 2)
+        key = min((rows_left, blocked, owed, left), (rows_left, mirrored, owed[::-1], left))
+        ways = self._memo.get(key)
+        if ways is None:
+            if rows_left == 0:
+                ways = int(not any(owed) and not any(left))
+            else:
+                # Different fillings often lead to the same state: count each state once
+                nexts = {}
+                for _, nxt in self._fillings(rows_left, blocked, owed, left):
+                    nexts[nxt] = nexts.get(nxt, 0) + 1
+                ways = sum(n * self._ways(rows_left - 1, *nxt) for nxt, n in nexts.items())
+            self._memo[key] = ways
+        return ways
+
+    def _fillings(self, rows_left, blocked, owed, left):
+        """Every legal filling of the next row: [(ships started (x, length, vertical), next state)]"""
+        size = self.size
+        full = (1 << size) - 1
+        touching = self.adjacency != 'allowed'
+        spread = self.adjacency == 'forbidden'  # ships may not touch diagonally either
+        owed_mask = sum(1 << x for x in range(size) if owed[x])
+        # Not enough rows left for the vertical ships already started
+        if any(n > rows_left for n in owed):
+            return []
+
+        lengths = self.lengths
+        left = list(left)
+        next_owed = [0] * size
+        ships = []
+        out = []
+
+        def fill(x, occupied):
+            if x == size:
+                if spread:
+                    occupied = (occupied | occupied << 1 | occupied >> 1) & full
+                out.append((tuple(ships), (occupied if touching else 0, tuple(next_owed), tuple(left))))
+                return
+            after_ship = touching and x > 0 and (occupied >> (x - 1)) & 1
+            if owed[x]:
+                # Cell taken by a vertical ship from above, which may not touch a ship to its left
+                if not after_ship:
+                    next_owed[x] = owed[x] - 1
+                    fill(x + 1, occupied | 1 << x)
+                    next_owed[x] = 0
+                return
+            fill(x + 1, occupied)
+            if after_ship or (blocked >> x) & 1:
+                return
+            for i, length in enumerate(lengths):
+                if not left[i]:
+                    continue
+                left[i] -= 1
+                span = ((1 << length) - 1) << x
+                if x + length <= size and not span & (blocked | owed_mask):
+                    ships.append((x, length, False))
+                    fill(x + length, occupied | span)
+                    ships.pop()
+                if 1 < length <= rows_left:
+                    ships.append((x, length, True))
+                    next_owed[x] = length - 1
+                    fill(x + 1, occupied | 1 << x)
+                    next_owed[x] = 0
+                    ships.pop()
+                left[i] += 1
+
+        fill(0, 0)
+        return out
@@ -0,0 +1,286 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from array import array
+
+import numpy as np
+
+from classes import PlacementHistory, Player, Ship
+from rules import Rules
+from seeding import game_seed, game_streams
+from server import read_message, write_message
+from simulation import fleet_layout
+from strategies import SHOOTERS
+
+OPS = ("connect", "join", "place", "fire")
+
+
+# CLASS: LoadStats
+class LoadStats:
+    """Latencies (seconds, per operation) and outcome counts gathered by simulated clients"""
+
+    def __init__(self):
+        self.latencies = {op: array('d') for op in OPS}
+        self.games = 0
+        self.requests = 0
+        self.errors = {}  # message -> count
+
+    def error(self, message):
+        self.errors[message] = self.errors.get(message, 0) + 1
+
+    def merge(self, other):
+        for op in OPS:
+            self.latencies[op].extend(other.latencies[op])
+        self.games += other.games
+        self.requests += other.requests
+        for message, n in other.errors.items():
+            self.errors[message] = self.errors.get(message, 0) + n
+
+    def summary(self, elapsed):
+        """Throughput, latency percentiles (ms) and error rate over a run of elapsed seconds"""
+        report = {"elapsed": elapsed, "games": self.games, "games_per_s": self.games / elapsed,
+                  "moves": len(self.latencies["fire"]), "moves_per_s": len(self.latencies["fire"]) / elapsed,
+                  "requests": self.requests, "errors": sum(self.errors.values()),
+                  "error_rate": sum(self.errors.values()) / max(self.requests, 1)}
+        for op in OPS:
+            values = np.frombuffer(self.latencies[op], dtype=np.float64) * 1000
+            if values.size:
+                p50, p99 = np.percentile(values, (50, 99))
+                report[op] = {"p50_ms": float(p50), "p99_ms": float(p99), "max_ms": float(values.max())}
+        return report
+
+
+def _result(hit):
+    # Stand-in for the Ship a local fire() returns on a hit that sinks nothing, so the simulation
+    # shooters can be reused as they are
+    if not hit:
+        return None
+    ship = Ship("?", 1)
+    ship.y = ship.x = 0
+    return ship
+
+
+def _sunk_ship(name, cells, size):
+    # The sunk Ship rebuilt from the cells (y * size + x, in ship order) a fire reply gives for it
+    ship = Ship(name, len(cells))
+    ship.y, ship.x = divmod(cells[0], size)
+    ship.vertical = len(cells) > 1 and cells[1] - cells[0] == size
+    ship.hits = (1 << len(cells)) - 1
+    return ship
+
+
+async def play_client(host, port, match_id, seed, stats, placement="random", shooter="hunt_target"):
+    """Play one game as a client: join match_id, place a fleet, then fire until someone wins"""
+    streams = game_streams(seed)
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        stats.error(f"connect: {e.__class__.__name__}")
+        return
+    stats.latencies["connect"].append(time.perf_counter() - start)
+
+    async def call(message, op=None):
+        stats.requests += 1
+        sent = time.perf_counter()
+        write_message(writer, message)
+        await writer.drain()
+        reply = await read_message(reader)
+        if op is not None:
+            stats.latencies[op].append(time.perf_counter() - sent)
+        if reply["type"] == "error":
+            stats.error(reply["message"])
+            return None
+        return reply
+
+    try:
+        joined = await call({"type": "join", "match": match_id, "name": match_id}, "join")
+        if joined is None:
+            return
+        seat = joined["seat"]
+        rules = Rules(joined["size"], joined["fleet"], joined["adjacency"], joined["shots_per_turn"])
+        me = Player(match_id, rules, rng=streams[f"p{seat + 1}_placement"], shot_rng=streams[f"p{seat + 1}_shots"])
+        if placement == "server":
+            placed = await call({"type": "place"}, "place")
+            if placed is None:
+                return
+            # Keep a copy of the fleet the server drew, so shooters see the fleet in play
+            history = PlacementHistory(me.board)
+            for (name, length), (y, x, direction) in zip(rules.fleet, placed["fleet"]):
+                history.place(Ship(name, length), (y, x), direction)
+        else:
+            # Draw the fleet here and have the server check it
+            me.board.place_fleet_random(rules.fleet)
+            placed = await call({"type": "place", "layout": fleet_layout(me.board)}, "place")
+            if placed is None:
+                return
+
+        finished = False
+        ai = SHOOTERS[shooter](me)
+        size = rules.size
+        guesses = me.guess_board.grid.ravel()
+        while True:
+            state = await call({"type": "wait"})
+            if state is None:
+                break
+            if state["winner"] is not None:
+                finished = True
+                break
+            if not all(state["present"]):
+                break
+            count = state["afloat"][seat] if rules.salvo else rules.shots_per_turn
+            targets = []
+            for _ in range(count):
+                target = ai.choose()
+                if target is None:
+                    break
+                me.record_shot(*target)  # so the next choice in this turn is a different cell
+                targets.append(target)
+            cells = [y * size + x for y, x in targets]
+            reply = await call({"type": "fire", "cells": cells}, "fire")
+            if reply is None:
+                break
+            # Mark the guess board as Player.fire does: -1 miss, 1 hit, 2 on every cell of a sunk ship
+            for cell, hit in zip(cells, reply["hits"]):
+                guesses[cell] = 1 if hit else -1
+            sinks = {}  # shot number -> the ship it sank (the last shot of the turn on that ship)
+            for name, ship_cells in zip(reply["sunk"], reply["sunk_cells"]):
+                guesses[ship_cells] = 2
+                last = max(i for i, cell in enumerate(cells) if cell in ship_cells)
+                sinks[last] = _sunk_ship(name, ship_cells, size)
+            for i, ((y, x), hit) in enumerate(zip(targets, reply["hits"])):
+                ai.update(y, x, sinks[i] if i in sinks else _result(hit))
+            if reply["winner"] is not None:
+                finished = True
+                break
+        stats.games += finished and seat == 0  # count each finished match once
+    except (OSError, asyncio.IncompleteReadError) as e:
+        stats.error(f"connection: {e.__class__.__name__}")
+    finally:
+        writer.close()
+
+
+async def run_clients(host, port, clients, games, seed=0, first=0, placement="random", shooter="hunt_target",
+                      ramp=0.0):
+    """Run clients (in pairs, one pair per match) that each play games games; returns LoadStats
+
+    first numbers the clients of this process among all processes, so match ids and
+    seeds never collide. Client starts are spread over ramp seconds.
+    """
+    stats = LoadStats()
+
+    async def client(i):
+        if ramp:
+            await asyncio.sleep(ramp * i / clients)
+        number = first + i
+        for game in range(games):
+            match_id = f"m{number // 2}-{game}"
+            await play_client(host, port, match_id, game_seed(seed, number, game), stats, placement, shooter)
+
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return stats
+
+
+def _raise_fd_limit():
+    # Every client holds a socket; a few thousand need more than the usual 1024 descriptors
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536, hard))
+
+
+def _client_process(args):
+    host, port, clients, games, seed, first, placement, shooter, ramp = args
+    _raise_fd_limit()
+    return asyncio.run(run_clients(host, port, clients, games, seed, first, placement, shooter, ramp))
+
+
+def run_load(host, port, clients=1000, games=1, processes=1, seed=0, placement="random", shooter="hunt_target",
+             ramp=1.0):
+    """Spread clients over processes (each with its own event loop); returns (LoadStats, seconds)"""
+    from multiprocessing import Pool
+
+    clients += clients % 2  # whole matches only
+    # Keep the two clients of a match in the same process so they start together
+    pairs = [clients // 2 // processes + (p < clients // 2 % processes) for p in range(processes)]
+    jobs, first = [], 0
+    for n in pairs:
+        jobs.append((host, port, 2 * n, games, seed, first, placement, shooter, ramp))
+        first += 2 * n
+    start = time.perf_counter()
+    if processes == 1:
+        results = [_client_process(jobs[0])]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(_client_process, jobs)
+    elapsed = time.perf_counter() - start
+    stats = LoadStats()
+    for result in results:
+        stats.merge(result)
+    return stats, elapsed
+
+
+def start_local_server(port=0, queue_size=64):
+    """Start server.py as a separate process on loopback; returns (process, port)"""
+    import socket
+
+    if not port:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    process = subprocess.Popen([sys.executable, script, "--port", str(port), "--queue-size", str(queue_size),
+                                "--metrics-interval", "0"], stdout=subprocess.DEVNULL)
+    for _ in range(200):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("The game server did not start.")
+
+
+def print_report(report, clients, processes):
+    print(f"{clients} clients in {processes} processes: {report['games']} games in {report['elapsed']:.1f} s")
+    print(f"  throughput: {report['games_per_s']:.1f} games/s, {report['moves_per_s']:.0f} moves/s")
+    for op in OPS:
+        if op in report:
+            r = report[op]
+            print(f"  {op:>7}: p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms  max {r['max_ms']:.2f} ms")
+    print(f"  errors: {report['errors']} of {report['requests']} requests ({100 * report['error_rate']:.3f}%)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test a game server with simulated clients")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--games", type=int, default=1, help="games played by each client")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() // 2 or 1)
+    parser.add_argument("--host", help="server to test (default: start server.py on loopback)")
+    parser.add_argument("--port", type=int, default=5008)
+    parser.add_argument("--placement", choices=("random", "server"), default="random")
+    parser.add_argument("--shooter", choices=sorted(SHOOTERS), default="hunt_target")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which clients connect")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    host, port = args.host, args.port
+    if host is None:
+        server, port = start_local_server()
+        host = "127.0.0.1"
+    try:
+        stats, elapsed = run_load(host, port, args.clients, args.games, args.processes, args.seed,
+                                  args.placement, args.shooter, args.ramp)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print_report(stats.summary(elapsed), args.clients, args.processes)
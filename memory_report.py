@@ -0,0 +1,84 @@
+import sys
+import numpy as np
+
+
+def deep_sizeof(obj, shared=(), _seen=None):
+    """Bytes held by obj and everything it references
+
+    Objects in shared (e.g. fleet definitions used by every game) and objects
+    reachable only through them are not counted.
+    """
+    if _seen is None:
+        _seen = set(id(o) for o in shared)
+        for o in shared:
+            _mark_reachable(o, _seen)
+    if id(obj) in _seen or isinstance(obj, type):
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray):
+        # getsizeof already includes the data of arrays that own it
+        if obj.base is not None:
+            size += deep_sizeof(obj.base, shared, _seen)
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += deep_sizeof(k, shared, _seen) + deep_sizeof(v, shared, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, shared, _seen)
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), shared, _seen)
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(obj, name):
+                size += deep_sizeof(getattr(obj, name), shared, _seen)
+    return size
+
+
+def _mark_reachable(obj, seen):
+    items = obj.values() if isinstance(obj, dict) else obj if isinstance(obj, (list, tuple, set)) else ()
+    for item in items:
+        if id(item) not in seen:
+            seen.add(id(item))
+            _mark_reachable(item, seen)
+
+
+def match_report(game):
+    """Memory footprint of a set-up two-player match: [(part, bytes)]"""
+    from rules import _tables
+    shared = (game.ships_to_place, _tables)
+    rows = []
+    for player in game.players:
+        rows.append((f"{player.name}: fleet board", deep_sizeof(player.board, shared)))
+        rows.append((f"{player.name}: guess board", deep_sizeof(player.guess_board, shared)))
+        rows.append((f"{player.name}: total", deep_sizeof(player, shared)))
+    rows.append(("match (live objects)", deep_sizeof(game.players, shared)))
+    if hasattr(game, "pack"):
+        rows.append(("match (packed for idle hosting)", sys.getsizeof(game.pack())))
+    return rows
+
+
+if __name__ == "__main__":
+    import random
+    from classes import Game, Player
+
+    # A match halfway through: both fleets placed and 30 shots fired each way
+    game = Game()
+    game.players = [Player("Player 1"), Player("Player 2")]
+    for player in game.players:
+        player.board.place_fleet_random(game.ships_to_place)
+    cells = list(range(100))
+    random.shuffle(cells)
+    for turn in range(60):
+        attacker, defender = game.players[turn % 2], game.players[1 - turn % 2]
+        attacker.fire(defender, *divmod(cells[turn // 2 + 50 * (turn % 2)], 10))
+
+    for part, size in match_report(game):
+        print(f"{part:<34}{size:>8} bytes")
+
+    # Computer players also keep a pool of unshot cells once they start sampling targets
+    game.players[0].random_target()
+    print(f"{'unshot pool (computer players)':<34}"
+          f"{deep_sizeof(game.players[0]) - deep_sizeof(game.players[1]):>8} bytes extra")
@@ -0,0 +1,92 @@
+import os
+import struct
+import numpy as np
+
+from endgame import placement_density
+
+MAGIC = b'BNOB'
+NO_SHOT = 255
+
+
+# CLASS: OpeningBook
+class OpeningBook:
+    """Precomputed first shots for every hit/miss outcome branch
+
+    The book is a complete binary tree stored in heap order: node 0 is the first
+    shot, a miss moves from node i to 2i + 1 and a hit to 2i + 2. Each node holds
+    the cell index (y * size + x) to fire at, so a depth-8 book is 255 bytes.
+    """
+
+    def __init__(self, ship_list, size=10, depth=8, path=None):
+        self.lengths = tuple(length for _, length in ship_list)
+        self.size = size
+        self.depth = depth
+        if path is None:
+            lengths = "-".join(str(length) for length in self.lengths)
+            path = os.path.join("books", f"opening_{size}x{size}_{lengths}_d{depth}.bin")
+        self.path = path
+        self._table = None  # loaded on first lookup
+
+    def lookup(self, outcomes):
+        """Next shot (y, x) after the given outcomes (True = hit), or None when off the book
+
+        Outcomes only cover hits and misses: once a ship is sunk the caller should
+        leave the book and compute shots itself.
+        """
+        if self._table is None:
+            self.load()
+        if len(outcomes) >= self.depth:
+            return None
+        node = 0
+        for hit in outcomes:
+            node = 2 * node + (2 if hit else 1)
+        cell = int(self._table[node])
+        if cell == NO_SHOT:
+            return None
+        return divmod(cell, self.size)
+
+    def load(self):
+        """Read the book from disk, building and saving it first if the file is missing"""
+        if not os.path.exists(self.path):
+            self.build()
+            self.save()
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        magic, size, depth, n_ships = struct.unpack_from('<4sBBB', data)
+        lengths = tuple(data[7:7 + n_ships])
+        if magic != MAGIC or size != self.size or depth != self.depth or lengths != self.lengths:
+            raise ValueError(f"{self.path} is not an opening book for this fleet and board.")
+        self._table = np.frombuffer(data, dtype=np.uint8, offset=7 + n_ships)
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = struct.pack('<4sBBB', MAGIC, self.size, self.depth, len(self.lengths)) + bytes(self.lengths)
+        # Write to a temporary file first so a crash never leaves half a book behind
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(header + self._table.tobytes())
+        os.replace(tmp, self.path)
+
+    def build(self):
+        """Compute the best shot at every node of the outcome tree"""
+        if self.size * self.size > NO_SHOT:
+            raise ValueError("Opening books only support boards of up to 15x15.")
+        table = np.full(2 ** self.depth - 1, NO_SHOT, dtype=np.uint8)
+
+        # Walk the tree keeping the misses and hits that lead to each node
+        stack = [(0, 0, 0)]
+        while stack:
+            node, misses, hits = stack.pop()
+            density = placement_density(misses, hits, 0, self.lengths, self.size)
+            if density.max() <= 0:
+                continue
+            cell = int(np.argmax(density))
+            table[node] = cell
+            if 2 * node + 2 < len(table):
+                stack.append((2 * node + 1, misses | 1 << cell, hits))
+                stack.append((2 * node + 2, misses, hits | 1 << cell))
+        self._table = table
+        return table
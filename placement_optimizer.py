@@ -0,0 +1,203 @@
+import os
+import numpy as np
+
+from endgame import placement_masks, halo_matrix, placement_density
+from classes import Board, Ship
+from seeding import shared_rng
+
+
+# CLASS: LayoutEvaluator
+class LayoutEvaluator:
+    """Batched scorer: expected hunting shots needed by a set of shooters to find every ship
+
+    A layout is one placement index per ship (see Board.placement_index). Each shooter is
+    modelled by sampled shot orders; a layout scores the mean, over orders, of the
+    shot on which its last ship is first hit. Once a ship is hit it falls quickly to
+    any targeting routine, so this hunting cost dominates the shots-to-sink.
+    """
+
+    def __init__(self, ship_list, size=10, strategies=('random', 'parity', 'density'),
+                 orders_per_strategy=64, seed=None):
+        self.size = size
+        self.lengths = [length for _, length in ship_list]
+        n = size * size
+        rng = np.random.default_rng(seed)
+
+        # Rank of each cell in every sampled shot order: (orders, cells)
+        orders = []
+        parity = (np.arange(n) // size + np.arange(n) % size) % 2 == 0
+        prior = placement_density(0, 0, 0, self.lengths, size)
+        for strategy in strategies:
+            for _ in range(orders_per_strategy):
+                noise = rng.random(n)
+                if strategy == 'random':
+                    key = noise
+                elif strategy == 'parity':
+                    key = noise + np.where(parity, 0.0, 1.0)
+                elif strategy == 'density':
+                    # Highest prior first, ties (symmetric cells) broken randomly
+                    key = -prior + noise * 1e-6
+                else:
+                    raise ValueError(f"Unknown shooter strategy: {strategy}")
+                orders.append(np.argsort(key))
+        ranks = np.empty((len(orders), n), dtype=np.int16)
+        for i, order in enumerate(orders):
+            ranks[i, order] = np.arange(n)
+        self.ranks = ranks
+
+        # Per ship: padded cell indices for each placement, plus cell and halo matrices
+        self.max_len = max(self.lengths)
+        self.cells, self.matrices, self.halos = [], [], []
+        for length in self.lengths:
+            matrix = placement_masks(size, length)[2]
+            idx = np.full((len(matrix), self.max_len), n, dtype=np.intp)
+            for p, row in enumerate(matrix):
+                on = np.flatnonzero(row)
+                idx[p, :len(on)] = on
+            self.cells.append(idx)
+            self.matrices.append(matrix.astype(bool))
+            self.halos.append(halo_matrix(size, length).astype(bool))
+        # Extra column so padding cells are never the first hit
+        self.padded_ranks = np.concatenate([ranks, np.full((len(ranks), 1), n, dtype=np.int16)], axis=1)
+
+    def n_placements(self, ship):
+        return len(self.cells[ship])
+
+    def valid(self, layouts):
+        """Which layouts (K x ships) respect the no-touch rule"""
+        cells = np.zeros((len(layouts), self.size * self.size), dtype=np.int16)
+        halos = np.zeros_like(cells)
+        for s in range(len(self.lengths)):
+            cells += self.matrices[s][layouts[:, s]]
+            halos += self.halos[s][layouts[:, s]]
+        # Every ship cell lies in exactly one halo (its own) when no two ships touch
+        return ((halos > 1) & (cells > 0)).sum(axis=1) == 0
+
+    def score(self, layouts):
+        """Expected hunting shots for each layout (K x ships), higher is harder to beat"""
+        last = np.zeros((len(layouts), len(self.ranks)), dtype=np.int16)
+        for s in range(len(self.lengths)):
+            cells = self.cells[s][layouts[:, s]]                 # K x L
+            first = self.padded_ranks[:, cells].min(axis=2)      # orders x K
+            np.maximum(last, first.T, out=last)
+        return last.mean(axis=1) + 1
+
+    def random_layouts(self, count, rng):
+        """Draw count valid layouts by rejection"""
+        found = []
+        while sum(len(f) for f in found) < count:
+            batch = np.stack([rng.integers(0, self.n_placements(s), 4 * count)
+                              for s in range(len(self.lengths))], axis=1)
+            found.append(batch[self.valid(batch)])
+        return np.concatenate(found)[:count]
+
+
+def optimise_layouts(ship_list, size=10, chains=256, steps=400, start_temp=2.0, end_temp=0.05,
+                     evaluator=None, seed=None):
+    """Simulated annealing over fleet layouts, run as many chains in parallel
+
+    Returns (layouts, scores) of the best layout found by each chain, best first.
+    """
+    rng = np.random.default_rng(seed)
+    if evaluator is None:
+        evaluator = LayoutEvaluator(ship_list, size, seed=rng.integers(2 ** 32))
+    n_ships = len(evaluator.lengths)
+    sizes = np.array([evaluator.n_placements(s) for s in range(n_ships)])
+
+    current = evaluator.random_layouts(chains, rng)
+    current_score = evaluator.score(current)
+    best, best_score = current.copy(), current_score.copy()
+    rows = np.arange(chains)
+
+    for step in range(steps):
+        temp = start_temp * (end_temp / start_temp) ** (step / max(1, steps - 1))
+
+        # Move one random ship per chain to a random new placement
+        proposal = current.copy()
+        ship = rng.integers(0, n_ships, chains)
+        proposal[rows, ship] = rng.integers(0, sizes[ship])
+        ok = evaluator.valid(proposal)
+        score = np.where(ok, evaluator.score(proposal), -np.inf)
+
+        accept = ok & ((score >= current_score) |
+                       (rng.random(chains) < np.exp(np.minimum(0, score - current_score) / temp)))
+        current[accept] = proposal[accept]
+        current_score[accept] = score[accept]
+        better = current_score > best_score
+        best[better] = current[better]
+        best_score[better] = current_score[better]
+
+    order = np.argsort(-best_score)
+    return best[order], best_score[order]
+
+
+# CLASS: LayoutLibrary
+class LayoutLibrary:
+    """Cache of strong fleet layouts on disk that random placement can draw from"""
+
+    def __init__(self, ship_list, size=10, path=None):
+        self.ship_list = list(ship_list)
+        self.size = size
+        if path is None:
+            lengths = "-".join(str(length) for _, length in self.ship_list)
+            path = os.path.join("layouts", f"layouts_{size}x{size}_{lengths}.npy")
+        self.path = path
+        self._starts = None  # (layouts, ships, 3) of y, x, direction (0 = H, 1 = V); loaded lazily
+
+    def build(self, count=256, **kwargs):
+        """Optimise count layouts and save them"""
+        layouts, _ = optimise_layouts(self.ship_list, self.size, chains=count, **kwargs)
+        starts = np.zeros(layouts.shape + (3,), dtype=np.int8)
+        board = Board(self.size)
+        for k, layout in enumerate(layouts):
+            for s, (_, length) in enumerate(self.ship_list):
+                (y, x), direction = board.placement_start(length, int(layout[s]))
+                starts[k, s] = (y, x, direction == 'V')
+        self._starts = starts
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.save(self.path, starts)
+        return starts
+
+    def layouts(self):
+        if self._starts is None:
+            if os.path.exists(self.path):
+                self._starts = np.load(self.path)
+            else:
+                self.build()
+        return self._starts
+
+    def draw(self, rng=None):
+        """Pick a random layout: [(y, x, direction)] in fleet order"""
+        if rng is None:
+            rng = shared_rng()
+        starts = self.layouts()
+        layout = starts[int(rng.integers(len(starts)))]
+        return [(int(y), int(x), 'V' if v else 'H') for y, x, v in layout]
+
+    def place(self, board, rng=None):
+        """Place the whole fleet on board from a random library layout (drawn with board.rng by default)"""
+        if rng is None:
+            rng = board.rng
+        layout = self.draw(rng)
+        # Mirror and transpose at random so the library is not a short list of fixed boards
+        flip_y, flip_x, transpose = (rng.random(3) < 0.5).tolist()
+        for (name, length), (y, x, direction) in zip(self.ship_list, layout):
+            if direction == 'H':
+                cells = [(y, x), (y, x + length - 1)]
+            else:
+                cells = [(y, x), (y + length - 1, x)]
+            if flip_y:
+                cells = [(self.size - 1 - cy, cx) for cy, cx in cells]
+            if flip_x:
+                cells = [(cy, self.size - 1 - cx) for cy, cx in cells]
+            if transpose:
+                cells = [(cx, cy) for cy, cx in cells]
+                direction = 'V' if direction == 'H' else 'H'
+            start = min(cells)
+            ship = Ship(name, length)
+            success, msg = ship.place(start, direction, board)
+            if not success:
+                raise ValueError(f"Library layout does not fit the board: {msg}")
+            board.add_ship(ship)
@@ -0,0 +1,182 @@
+import numpy as np
+
+# Fleet definition shared by every game (immutable, so no per-game copies)
+CLASSIC_FLEET = (
+    ('Aircraft carrier', 5),
+    ('Battleship', 4),
+    ('Cruiser', 3),
+    ('Submarine', 3),
+    ('MineSweeper', 2),
+)
+
+# Largest board: rows are labelled A-Z, then AA, AB, ... and the placement masks grow with the
+# cube of the size (a 64x64 board needs about 8 MB of them per ship length)
+MAX_SIZE = 64
+
+# How ships may touch: 'forbidden' (not even at the corners), 'diagonal' (only at the
+# corners) or 'allowed' (anywhere, as long as they do not overlap)
+ADJACENCY_MODES = ('forbidden', 'diagonal', 'allowed')
+
+
+# CLASS: Rules
+class Rules:
+    """A rule set: board size, fleet, adjacency rule and shots per turn
+
+    shots_per_turn='salvo' gives each player one shot per surviving ship every turn.
+    """
+
+    def __init__(self, size=10, fleet=CLASSIC_FLEET, adjacency='forbidden', shots_per_turn=1):
+        if not 1 <= size <= MAX_SIZE:
+            raise ValueError(f"Board size must be between 1 and {MAX_SIZE}.")
+        if adjacency not in ADJACENCY_MODES:
+            raise ValueError(f"Adjacency must be one of {', '.join(ADJACENCY_MODES)}.")
+        if shots_per_turn != 'salvo' and (not isinstance(shots_per_turn, int) or shots_per_turn < 1):
+            raise ValueError("Shots per turn must be a positive number or 'salvo'.")
+        fleet = tuple((str(name), int(length)) for name, length in fleet)
+        if any(not 1 <= length <= size for _, length in fleet):
+            raise ValueError("Every ship must fit on the board.")
+        self.size = size
+        self.fleet = fleet
+        self.adjacency = adjacency
+        self.shots_per_turn = shots_per_turn
+        self.tables = rule_tables(size, adjacency)  # shared with every rule set of this size and adjacency
+
+    @property
+    def salvo(self):
+        return self.shots_per_turn == 'salvo'
+
+    @property
+    def key(self):
+        return self.size, self.fleet, self.adjacency, self.shots_per_turn
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return (f"Rules(size={self.size}, fleet={self.fleet!r}, adjacency={self.adjacency!r}, "
+                f"shots_per_turn={self.shots_per_turn!r})")
+
+
+# CLASS: RuleTables
+class RuleTables:
+    """Lookup tables compiled once per board size and adjacency rule"""
+
+    def __init__(self, size, adjacency):
+        self.size = size
+        self.adjacency = adjacency
+        self.labels = tuple(row_label(y) for y in range(size))  # row letters
+        self.row_of = {letter: y for y, letter in enumerate(self.labels)}
+
+        if adjacency == 'forbidden':
+            offsets = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]
+        elif adjacency == 'diagonal':
+            offsets = [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)]
+        else:
+            offsets = [(0, 0)]
+
+        # Per cell: the flat indices that must be empty to put a ship cell there, and the same as a mask
+        neighbours, masks = [], []
+        for y in range(size):
+            for x in range(size):
+                cells = [(y + dy) * size + x + dx for dy, dx in offsets
+                         if 0 <= y + dy < size and 0 <= x + dx < size]
+                neighbours.append(np.array(cells, dtype=np.intp))
+                masks.append(sum(1 << c for c in cells))
+        self.neighbours = tuple(neighbours)
+        self.neighbour_masks = tuple(masks)
+        self._masks = {}
+        self._placements = {}
+        self._halo_matrices = {}
+
+    def with_neighbours(self, mask):
+        """Grow a cell mask by the cells a ship may not touch"""
+        grown = 0
+        while mask:
+            low = mask & -mask
+            grown |= self.neighbour_masks[low.bit_length() - 1]
+            mask ^= low
+        return grown
+
+    def ship_masks(self, length):
+        """Every in-bounds placement of a ship: (cell masks, halo masks)
+
+        Horizontal placements come first in row-major order of their first cell, then
+        vertical ones (a ship of length 1 only has the horizontal ones).
+        """
+        if length not in self._masks:
+            size = self.size
+            cells, halos = [], []
+            starts = [(y, x, 'H') for y in range(size) for x in range(size - length + 1)]
+            if length > 1:
+                starts += [(y, x, 'V') for y in range(size - length + 1) for x in range(size)]
+            for y, x, direction in starts:
+                m = h = 0
+                for i in range(length):
+                    cell = y * size + x + i if direction == 'H' else (y + i) * size + x
+                    m |= 1 << cell
+                    h |= self.neighbour_masks[cell]
+                cells.append(m)
+                halos.append(h)
+            self._masks[length] = (tuple(cells), tuple(halos))
+        return self._masks[length]
+
+    def placements(self, length):
+        """ship_masks plus the cells of every placement as a 0/1 matrix, for the AI's matrix products
+
+        The matrix is placements x cells, so it is only built for whoever asks for it.
+        """
+        if length not in self._placements:
+            cells, halos = self.ship_masks(length)
+            self._placements[length] = (cells, halos, masks_to_matrix(cells, self.size))
+        return self._placements[length]
+
+    def halo_matrix(self, length):
+        """Halo (cells plus the cells they may not touch) of every placement as a 0/1 matrix"""
+        if length not in self._halo_matrices:
+            self._halo_matrices[length] = masks_to_matrix(self.ship_masks(length)[1], self.size)
+        return self._halo_matrices[length]
+
+
+def row_label(y):
+    """Letters of row y: A-Z, then AA, AB, ... as spreadsheet columns are named"""
+    label = ''
+    y += 1
+    while y:
+        y, letter = divmod(y - 1, 26)
+        label = chr(ord('A') + letter) + label
+    return label
+
+
+_tables = {}
+
+
+def rule_tables(size=10, adjacency='forbidden'):
+    """Shared RuleTables for a board size and adjacency rule, compiled on first use"""
+    key = (size, adjacency)
+    if key not in _tables:
+        _tables[key] = RuleTables(size, adjacency)
+    return _tables[key]
+
+
+CLASSIC_RULES = Rules()
+
+
+def masks_to_matrix(masks, size):
+    """Stack integer masks into a (len(masks), size*size) float32 0/1 matrix"""
+    n = size * size
+    nbytes = (n + 7) // 8
+    raw = b''.join(m.to_bytes(nbytes, 'little') for m in masks)
+    bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8).reshape(len(masks), nbytes),
+                         axis=1, bitorder='little')[:, :n]
+    return bits.astype(np.float32)
+
+
+def mask_to_vector(mask, size):
+    """Integer mask as a size*size float32 0/1 vector"""
+    n = size * size
+    bits = np.unpackbits(np.frombuffer(mask.to_bytes((n + 7) // 8, 'little'), dtype=np.uint8),
+                         bitorder='little')[:n]
+    return bits.astype(np.float32)
@@ -0,0 +1,141 @@
+import sqlite3
+import sys
+import threading
+import queue
+import time
+
+
+# CLASS: Scoreboard
+class Scoreboard:
+    """Persistent scoreboard stored in a local SQLite database"""
+
+    def __init__(self, path="scoreboard.db", batch_size=256, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._closed = False
+        self.last_error = None  # the latest failed write, if any
+        self.dropped = 0        # games lost to failed writes
+
+        # Create the schema up front so queries work before the first write
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    id INTEGER PRIMARY KEY,
+                    player1 TEXT NOT NULL,
+                    player2 TEXT NOT NULL,
+                    winner TEXT NOT NULL,
+                    shots INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    finished_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_winner ON games (winner)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_shots ON games (shots)")
+        conn.close()
+
+        # All writes go through one background thread so the game loop never waits on disk
+        self._writer = threading.Thread(target=self._write_loop, name="scoreboard-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def record_game(self, player1, player2, winner, shots, duration):
+        """Queue a finished game for writing (returns immediately)"""
+        if self._closed:
+            raise RuntimeError("Scoreboard is closed.")
+        self._queue.put((player1, player2, winner, int(shots), float(duration), time.time()))
+
+    def _write_loop(self):
+        conn = self._connect()
+        stop = False
+        while not stop:
+            # Block for the first row, then gather whatever else arrives within the flush window
+            batch = []
+            waiters = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or waiters or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            # One transaction per batch; a failed batch is reported and dropped so the thread keeps going
+            try:
+                if batch:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO games (player1, player2, winner, shots, duration, finished_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?)", batch)
+            except sqlite3.Error as e:
+                self.last_error = e
+                self.dropped += len(batch)
+                print(f"Scoreboard: could not record {len(batch)} games: {e}", file=sys.stderr)
+            finally:
+                for event in waiters:
+                    event.set()
+        conn.close()
+
+    def flush(self):
+        """Wait until every queued game has been written"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Write pending games and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def leaderboard(self, limit=10):
+        """Players ordered by number of wins: [(name, wins, avg shots)]"""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT winner, COUNT(*) AS wins, AVG(shots) FROM games "
+                "GROUP BY winner ORDER BY wins DESC, winner LIMIT ?", (limit,)).fetchall()
+        finally:
+            conn.close()
+
+    def fastest_wins(self, limit=10):
+        """Quickest wins by number of shots: [(winner, shots, duration)]"""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT winner, shots, duration FROM games ORDER BY shots, duration LIMIT ?",
+                (limit,)).fetchall()
+        finally:
+            conn.close()
+
+    def wins(self, player):
+        """Total recorded wins for one player"""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM games WHERE winner = ?", (player,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,48 @@
+import numpy as np
+
+# Every random draw in a game comes from one of these per-game streams
+STREAMS = ("p1_placement", "p2_placement", "p1_shots", "p2_shots")
+
+_shared = None
+
+
+def shared_rng():
+    """Generator used by boards that were not given one (unseeded, created on first use)"""
+    global _shared
+    if _shared is None:
+        _shared = np.random.default_rng()
+    return _shared
+
+
+def game_seed(root_seed, worker=0, game=0):
+    """SeedSequence for one game of a run
+
+    The (root_seed, worker, game) triple is all that is needed to replay the game:
+    streams for different workers and games never overlap, whichever process or
+    order they are played in.
+    """
+    return np.random.SeedSequence(root_seed, spawn_key=(worker, game))
+
+
+def game_streams(seed):
+    """Independent generators for a game, keyed by STREAMS
+
+    seed may be an int, a SeedSequence or None (fresh entropy).
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return {name: np.random.default_rng(child) for name, child in zip(STREAMS, seed.spawn(len(STREAMS)))}
+
+
+def describe_seed(seed):
+    """JSON-friendly description of a SeedSequence, enough to rebuild it"""
+    if not isinstance(seed, np.random.SeedSequence):
+        return seed
+    return {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+
+
+def seed_from_description(description):
+    """Inverse of describe_seed"""
+    if isinstance(description, dict):
+        return np.random.SeedSequence(description["entropy"], spawn_key=tuple(description["spawn_key"]))
+    return description
@@ -0,0 +1,391 @@
+import asyncio
+import json
+import struct
+import time
+import zlib
+
+from classes import Player, PlacementError, PlacementHistory, Ship
+from rules import CLASSIC_RULES
+from seeding import game_streams
+
+HEADER = struct.Struct('<I')  # payload length; same framing as distributed.py (zlib-compressed JSON)
+
+
+async def read_message(reader):
+    """Next message from a stream (raises asyncio.IncompleteReadError once the peer is gone)"""
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return json.loads(zlib.decompress(await reader.readexactly(length)))
+
+
+def write_message(writer, message):
+    payload = zlib.compress(json.dumps(message, separators=(',', ':')).encode('utf-8'))
+    writer.write(HEADER.pack(len(payload)) + payload)
+
+
+class MatchError(Exception):
+    """A command the match refuses (sent back to the client as an error message)"""
+
+
+# CLASS: MatchActor
+class MatchActor:
+    """One match, run as an asyncio task that alone owns its Players and Boards
+
+    Commands go through a bounded queue and are applied one at a time by run(), so
+    two clients can never act on the same boards at once and nothing needs a lock.
+    When the queue is full, submit() waits for room: the connection that sent the
+    command stops being read until the match catches up, which pushes back on the
+    client through TCP instead of buffering without limit.
+    """
+
+    def __init__(self, match_id, rules=None, queue_size=64, seed=None, scoreboard=None):
+        self.match_id = match_id
+        self.scoreboard = scoreboard  # optional scoreboard.Scoreboard that every won match is recorded on
+        self.rules = rules if rules is not None else CLASSIC_RULES
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.streams = game_streams(seed)
+        self.players = []
+        self.present = []     # per seat: is the client still connected
+        self.placed = []      # per seat: is the fleet down
+        self.turn = None      # seat to fire next, once both fleets are placed
+        self.winner = None
+        self.started = None   # time.monotonic() when both fleets were down
+        self.closed = False   # every player has left; the actor takes no more commands
+        self.waiting = {}     # seat -> future of a "wait" command, answered when that seat may act
+        self.last_shots = []  # cells fired in the last turn
+        # Queue metrics
+        self.commands = 0
+        self.max_depth = 0
+        self.depth_total = 0  # sum of the queue depth right after each command joined it
+        self.wait_total = 0.0  # seconds commands spent queued
+        self.full_waits = 0   # submits that had to wait for room
+
+    async def submit(self, kind, seat=None, *args):
+        """Queue a command and wait for its result (raises MatchError if it is refused)"""
+        return await (await self.enqueue(kind, seat, *args))
+
+    async def enqueue(self, kind, seat=None, *args):
+        """Queue a command once there is room; returns a future for its result"""
+        future = asyncio.get_running_loop().create_future()
+        if self.queue.full():
+            self.full_waits += 1
+        await self.queue.put((kind, seat, args, future, time.perf_counter()))
+        depth = self.queue.qsize()
+        self.depth_total += depth
+        self.max_depth = max(self.max_depth, depth)
+        return future
+
+    async def run(self):
+        """Apply commands until every player has left"""
+        while True:
+            kind, seat, args, future, queued = await self.queue.get()
+            self.commands += 1
+            self.wait_total += time.perf_counter() - queued
+            if kind == 'wait':
+                if seat in self.waiting:
+                    # Replies go out in order, so a second wait could never be answered before the first
+                    future.set_exception(MatchError("You are already waiting."))
+                else:
+                    self.waiting[seat] = future
+                    self._wake()
+                continue
+            try:
+                result = getattr(self, '_' + kind)(seat, *args)
+            except MatchError as e:
+                if not future.done():
+                    future.set_exception(e)
+            except Exception as e:
+                # A malformed command must not take the match down for both players
+                if not future.done():
+                    future.set_exception(MatchError(f"Bad {kind} command: {e}"))
+            else:
+                if not future.done():
+                    future.set_result(result)
+            self._wake()
+            if kind == 'leave' and self.players and not any(self.present):
+                self.closed = True
+                # Commands that slipped in behind the last leave get an answer instead of waiting forever
+                while not self.queue.empty():
+                    future = self.queue.get_nowait()[3]
+                    if not future.done():
+                        future.set_exception(MatchError("The match has ended."))
+                return
+
+    def _wake(self):
+        # Answer the waits of seats whose turn it is, or everyone's once the match is decided or abandoned
+        for seat, future in list(self.waiting.items()):
+            if seat == self.turn or self.winner is not None or not all(self.present):
+                del self.waiting[seat]
+                if not future.done():
+                    future.set_result(self._state(seat))
+
+    def metrics(self):
+        """Queue-depth and wait statistics of this match"""
+        n = max(self.commands, 1)
+        return {"depth": self.queue.qsize(), "max_depth": self.max_depth, "commands": self.commands,
+                "mean_depth": self.depth_total / n, "mean_wait_ms": 1000 * self.wait_total / n,
+                "full_waits": self.full_waits}
+
+    # Commands: each gets the seat that sent it, runs inside the actor task and returns a JSON-friendly reply
+
+    def _join(self, seat, name):
+        if len(self.players) == 2:
+            raise MatchError("The match is full.")
+        seat = len(self.players)
+        prefix = f"p{seat + 1}_"
+        self.players.append(Player(name, self.rules, self.streams[prefix + "placement"], self.streams[prefix + "shots"]))
+        self.present.append(True)
+        self.placed.append(False)
+        rules = self.rules
+        return {"seat": seat, "size": rules.size, "fleet": [list(ship) for ship in rules.fleet],
+                "adjacency": rules.adjacency, "shots_per_turn": rules.shots_per_turn}
+
+    def _leave(self, seat):
+        if seat is not None:
+            self.present[seat] = False
+        return None
+
+    def _place(self, seat, layout=None):
+        """Place the fleet from a layout [(y, x, direction)] in fleet order, or at random if layout is None"""
+        if self.placed[seat]:
+            raise MatchError("Your fleet is already placed.")
+        board = self.players[seat].board
+        if layout is None:
+            try:
+                board.place_fleet_random(self.rules.fleet)
+            except PlacementError as e:
+                raise MatchError(str(e))
+        else:
+            if not isinstance(layout, list) or len(layout) != len(self.rules.fleet):
+                raise MatchError(f"Send a position for each of the {len(self.rules.fleet)} ships.")
+            for position in layout:
+                if (not isinstance(position, list) or len(position) != 3 or position[2] not in ('H', 'V')
+                        or not all(type(v) is int and 0 <= v < self.rules.size for v in position[:2])):
+                    raise MatchError("A position is [row, column, 'H' or 'V'].")
+            history = PlacementHistory(board)
+            for (name, length), (y, x, direction) in zip(self.rules.fleet, layout):
+                ok, message = history.place(Ship(name, length), (y, x), direction)
+                if not ok:
+                    while history.undo() is not None:
+                        pass
+                    raise MatchError(f"{name}: {message}")
+        self.placed[seat] = True
+        if len(self.placed) == 2 and all(self.placed):
+            self.turn = 0
+            self.started = time.monotonic()
+        return {"fleet": [[ship.y, ship.x, 'V' if ship.vertical else 'H'] for ship in board.ships],
+                "turn": self.turn}
+
+    def _fire(self, seat, cells):
+        """Fire a whole turn: cells (y * size + x) must number shots_per_turn (or ships afloat in salvo mode)"""
+        if self.winner is not None:
+            raise MatchError("The match is over.")
+        if self.turn is None:
+            raise MatchError("Both fleets must be placed first.")
+        if seat != self.turn:
+            raise MatchError("It is not your turn.")
+        if not isinstance(cells, list) or not all(type(cell) is int for cell in cells):
+            raise MatchError("Cells are a list of y * size + x numbers.")
+        attacker, defender = self.players[seat], self.players[1 - seat]
+        size = self.rules.size
+        unshot = size * size - bin(attacker.shots).count('1')
+        wanted = attacker.board.ships_afloat() if self.rules.salvo else self.rules.shots_per_turn
+        wanted = min(wanted, unshot)
+        if len(cells) != wanted:
+            raise MatchError(f"Fire exactly {wanted} shots.")
+        if len(set(cells)) != len(cells):
+            raise MatchError("The same cell was targeted twice.")
+        for cell in cells:
+            if not 0 <= cell < size * size:
+                raise MatchError("Target off the board.")
+            if attacker.has_shot(*divmod(cell, size)):
+                raise MatchError("You already shot there.")
+
+        if len(cells) == 1:
+            result = attacker.fire(defender, *divmod(cells[0], size))
+            hits = [result is not None]
+            sunk_ships = [result] if result is not None and result.is_sunk() else []
+        else:
+            results, sunk_ships = attacker.fire_salvo(defender, cells)
+            hits = [result is not None for result in results]
+        if defender.all_sunk():
+            self.winner = seat
+            self.turn = None
+            if self.scoreboard is not None:
+                # Only queues the row: the scoreboard's own thread writes it
+                self.scoreboard.record_game(self.players[0].name, self.players[1].name, attacker.name,
+                                            bin(attacker.shots).count('1'), time.monotonic() - self.started)
+        else:
+            self.turn = 1 - seat
+        self.last_shots = list(cells)
+        # Sunk ships are named and their cells given, so a client can mark its guess board as Player.fire does
+        return {"hits": hits, "sunk": [ship.name for ship in sunk_ships],
+                "sunk_cells": [[y * size + x for y, x in ship.coordinates] for ship in sunk_ships],
+                "turn": self.turn, "winner": self.winner}
+
+    def _state(self, seat):
+        return {"turn": self.turn, "winner": self.winner, "placed": self.placed, "present": self.present,
+                "last_shots": self.last_shots,
+                "shots": [bin(player.shots).count('1') for player in self.players],
+                "afloat": [player.board.ships_afloat() for player in self.players]}
+
+
+# CLASS: GameServer
+class GameServer:
+    """TCP front end: routes each connection's commands to the actor of its match
+
+    A client first sends {"type": "join", "match": id, "name": name}; after that it may
+    send "place" ({"layout": [...]} or nothing for a random fleet), "fire"
+    ({"cells": [...]}), "state" and "wait" (answered with the state once it is the
+    client's turn or the match is over) messages without waiting for replies.
+    Replies come back in order, each echoing the message's "id" if it had one.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, rules=None, queue_size=64, backlog=1024, scoreboard=None):
+        self.host = host
+        self.port = port
+        self.backlog = backlog  # pending connections the kernel holds (asyncio's default of 100 drops bursts)
+        self.rules = rules if rules is not None else CLASSIC_RULES
+        self.queue_size = queue_size
+        self.scoreboard = scoreboard  # optional scoreboard.Scoreboard shared by every match
+        self.matches = {}   # match id -> MatchActor
+        self.finished = 0   # matches whose actor has stopped
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port, backlog=self.backlog)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def match(self, match_id):
+        """The actor for a match, started on first use"""
+        actor = self.matches.get(match_id)
+        if actor is None or actor.closed:
+            actor = self.matches[match_id] = MatchActor(match_id, self.rules, self.queue_size,
+                                                        scoreboard=self.scoreboard)
+            task = asyncio.get_running_loop().create_task(actor.run())
+            task.add_done_callback(lambda _: self._drop(match_id, actor))
+        return actor
+
+    def _drop(self, match_id, actor):
+        if self.matches.get(match_id) is actor:
+            del self.matches[match_id]
+        self.finished += 1
+
+    def metrics(self):
+        """{match id: queue metrics} for the matches in progress"""
+        return {match_id: actor.metrics() for match_id, actor in self.matches.items()}
+
+    async def _serve(self, reader, writer):
+        replies = asyncio.Queue()
+        sender = asyncio.get_running_loop().create_task(self._send_replies(replies, writer))
+        actor = seat = None
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, ValueError, zlib.error):
+                    break
+                if not isinstance(message, dict):
+                    await replies.put((None, MatchError("A message is a JSON object.")))
+                    continue
+                kind = message.get("type")
+                if kind == "join" and actor is None:
+                    if not isinstance(message.get("match"), (str, int)):
+                        await replies.put((message.get("id"), MatchError("A match id is a string or a number.")))
+                        continue
+                    # Joining is awaited so the seat is known before anything else is queued
+                    candidate = self.match(message.get("match"))
+                    try:
+                        reply = await candidate.submit("join", None, str(message.get("name", "Player")))
+                    except MatchError as e:
+                        await replies.put((message.get("id"), e))
+                        continue
+                    actor, seat = candidate, reply["seat"]
+                    await replies.put((message.get("id"), reply))
+                elif actor is None:
+                    await replies.put((message.get("id"), MatchError("Join a match first.")))
+                elif kind == "join":
+                    await replies.put((message.get("id"), MatchError("You are already in a match.")))
+                elif kind == "place":
+                    await replies.put((message.get("id"), await actor.enqueue("place", seat, message.get("layout"))))
+                elif kind == "fire":
+                    # The actor checks the cells
+                    await replies.put((message.get("id"), await actor.enqueue("fire", seat, message.get("cells"))))
+                elif kind in ("state", "wait"):
+                    await replies.put((message.get("id"), await actor.enqueue(kind, seat)))
+                else:
+                    await replies.put((message.get("id"), MatchError(f"Unknown message type {kind!r}.")))
+        finally:
+            if actor is not None:
+                await actor.enqueue("leave", seat)
+            await replies.put(None)
+            await sender
+            writer.close()
+
+    async def _send_replies(self, replies, writer):
+        # Write replies in the order the commands arrived, as each one completes
+        while True:
+            item = await replies.get()
+            if item is None:
+                return
+            message_id, reply = item
+            if isinstance(reply, asyncio.Future):
+                try:
+                    reply = await reply
+                except MatchError as e:
+                    reply = e
+            if isinstance(reply, MatchError):
+                message = {"type": "error", "message": str(reply)}
+            else:
+                message = {"type": "ok", **(reply or {})}
+            if message_id is not None:
+                message["id"] = message_id
+            try:
+                write_message(writer, message)
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+
+async def _report(server, interval):
+    while True:
+        await asyncio.sleep(interval)
+        metrics = server.metrics()
+        deepest = max((m["max_depth"] for m in metrics.values()), default=0)
+        print(f"{len(metrics)} matches in progress, {server.finished} finished, deepest queue {deepest}")
+
+
+async def _main(host, port, queue_size, interval, scoreboard_path=None):
+    scoreboard = None
+    if scoreboard_path is not None:
+        from scoreboard import Scoreboard
+        scoreboard = Scoreboard(scoreboard_path)
+    server = GameServer(host, port, queue_size=queue_size, scoreboard=scoreboard)
+    await server.start()
+    print(f"Game server listening on {server.host}:{server.port}")
+    if interval:
+        asyncio.get_running_loop().create_task(_report(server, interval))
+    try:
+        await server.serve_forever()
+    finally:
+        if scoreboard is not None:
+            scoreboard.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Battleship match server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5008)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="seconds between reports (0: none)")
+    parser.add_argument("--scoreboard", help="SQLite file to record finished matches in")
+    args = parser.parse_args()
+    asyncio.run(_main(args.host, args.port, args.queue_size, args.metrics_interval, args.scoreboard))
@@ -0,0 +1,301 @@
+import json
+import time
+
+import numpy as np
+
+from classes import Ship, Player, Game
+from rules import CLASSIC_RULES
+from seeding import describe_seed, game_seed, game_streams, seed_from_description
+from strategies import SHOOTERS, LatencyMeter, make_placement, make_shooter
+
+
+def fleet_layout(board):
+    """Ship placements of a board as [[y, x, direction]] in fleet order"""
+    layout = []
+    for ship in board.ships:
+        layout.append([ship.y, ship.x, 'V' if ship.vertical else 'H'])
+    return layout
+
+
+def play_headless_game(ship_list=None, seed=None, shooters=("hunt_target", "hunt_target"), scoreboard=None):
+    """Play one full game between two computer players without any I/O
+
+    seed is an int, a SeedSequence (see seeding.game_seed) or the "seed" of an
+    earlier record; the same seed always replays the same game.
+
+    Returns a game record: the winner (0 or 1) and, for each player's fleet, its
+    layout, the opponent's shots against it (cell = y * size + x) and the shot
+    number on which each ship was sunk (None if it survived). The result also goes on
+    scoreboard, if given, with each seat named after its strategy.
+    """
+    seed = seed_from_description(seed)
+    players, winner, shots, sink_turns = _play(ship_list, seed, shooters, scoreboard=scoreboard)
+    return {
+        "seed": describe_seed(seed),
+        "size": players[0].board.size,
+        "winner": winner,
+        "strategies": list(shooters),
+        "sides": [
+            {"fleet": fleet_layout(players[i].board), "shots": shots[i], "sink_turns": sink_turns[i]}
+            for i in range(2)
+        ],
+    }
+
+
+def _play(ship_list, seed, shooters, placements=None, ais=None, scoreboard=None):
+    # One game: (players, winner, shots fired at each fleet, sink turns of each fleet's ships).
+    # placements: placement strategy per player (default: Board.place_fleet_random);
+    # ais: function (seat, player) -> shooter, to time or wrap them (default: SHOOTERS[shooters[seat]]);
+    # scoreboard: records the game with each seat named after its strategy
+    start = time.monotonic()
+    if ship_list is None:
+        ship_list = Game().ships_to_place
+    streams = game_streams(seed)
+    players = [Player(f"Player {i + 1}", rng=streams[f"p{i + 1}_placement"], shot_rng=streams[f"p{i + 1}_shots"])
+               for i in range(2)]
+    for i, player in enumerate(players):
+        if placements is None:
+            player.board.place_fleet_random(ship_list)
+        else:
+            placements[i].place(player.board, ship_list)
+    if ais is None:
+        ais = [SHOOTERS[shooters[i]](players[i]) for i in range(2)]
+    else:
+        ais = [ais(i, players[i]) for i in range(2)]
+
+    size = players[0].board.size
+    shots = [[], []]        # shots[i]: shots fired at player i's fleet
+    sink_turns = [[None] * len(ship_list) for _ in range(2)]
+    current = 0
+    while True:
+        attacker, defender = players[current], players[1 - current]
+        y, x = ais[current].choose()
+        result = attacker.fire(defender, y, x)
+        ais[current].update(y, x, result)
+        fired = shots[1 - current]
+        fired.append(y * size + x)
+        if isinstance(result, Ship) and result.is_sunk():
+            sink_turns[1 - current][defender.board.ships.index(result)] = len(fired)
+            if defender.all_sunk():
+                break
+        current = 1 - current
+    if scoreboard is not None:
+        scoreboard.record_game(shooters[0], shooters[1], shooters[current], len(shots[1 - current]),
+                               time.monotonic() - start)
+    return players, current, shots, sink_turns
+
+
+def write_records(path, records):
+    """Append game records to a JSON-lines log"""
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def simulate_to_file(path, games, seed=0, ship_list=None, shooters=("hunt_target", "hunt_target"), worker=0,
+                     scoreboard=None):
+    """Play games headless and log every record
+
+    Game i is seeded with game_seed(seed, worker, i), so parallel workers sharing a
+    root seed never reuse a stream and any single game can be replayed on its own.
+    """
+    batch = []
+    for i in range(games):
+        batch.append(play_headless_game(ship_list, game_seed(seed, worker, i), shooters, scoreboard))
+        if len(batch) >= 1000:
+            write_records(path, batch)
+            batch = []
+    write_records(path, batch)
+
+
+# CLASS: SharedResults
+class SharedResults:
+    """Per-game results in shared-memory NumPy arrays that worker processes fill in place
+
+    winner[g]            0 or 1
+    shots_to_win[g]      shots the winner fired
+    duration[g]          seconds the game took
+    sink_turns[g, i, s]  shot at player i's fleet that sank ship s (0 = survived)
+    hits[w, cell]        hits landed on each cell by worker w's games (one row per
+                         worker, so workers never write to the same element)
+
+    Workers only send back how many games they played; the parent reads the arrays
+    directly. Use as a context manager, or call close() and unlink() when done.
+    """
+
+    def __init__(self, games, workers, ships, cells, names=None):
+        from multiprocessing import shared_memory
+
+        self.layout = {
+            "winner": ((games,), np.int8),
+            "shots_to_win": ((games,), np.int16),
+            "duration": ((games,), np.float32),
+            "sink_turns": ((games, 2, ships), np.int16),
+            "hits": ((workers, cells), np.uint32),
+        }
+        self.shape = (games, workers, ships, cells)
+        self._blocks = {}
+        for field, (shape, dtype) in self.layout.items():
+            nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if names is None:
+                block = shared_memory.SharedMemory(create=True, size=nbytes)
+                np.ndarray(shape, dtype, buffer=block.buf)[...] = 0
+            else:
+                block = shared_memory.SharedMemory(name=names[field])
+            self._blocks[field] = block
+            setattr(self, field, np.ndarray(shape, dtype, buffer=block.buf))
+
+    @property
+    def spec(self):
+        """What a worker needs to attach: SharedResults(*spec)"""
+        return self.shape + ({field: block.name for field, block in self._blocks.items()},)
+
+    def hit_counts(self, size):
+        """Hits per cell over all games, as a size x size array"""
+        return self.hits.sum(axis=0, dtype=np.int64).reshape(size, size)
+
+    def close(self):
+        for field in self.layout:
+            setattr(self, field, None)  # drop the views before the buffers go
+        for block in self._blocks.values():
+            block.close()
+
+    def unlink(self):
+        for block in self._blocks.values():
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.unlink()
+
+
+def _play_shared(spec, worker, start, end, seed, ship_list, shooters):
+    """Play games start..end-1 straight into the shared arrays (runs in a worker process)"""
+    results = SharedResults(*spec)
+    hits = results.hits[worker]
+    try:
+        for g in range(start, end):
+            begun = time.monotonic()
+            players, winner, shots, sink_turns = _play(ship_list, game_seed(seed, 0, g), shooters)
+            results.duration[g] = time.monotonic() - begun
+            results.winner[g] = winner
+            results.shots_to_win[g] = len(shots[1 - winner])
+            results.sink_turns[g] = [[t or 0 for t in side] for side in sink_turns]
+            for player in players:
+                hits += (player.board.grid.ravel() == 2)
+    finally:
+        hits = None
+        results.close()
+    return end - start
+
+
+def simulate_shared(games, seed=0, ship_list=None, shooters=("hunt_target", "hunt_target"), processes=4,
+                    scoreboard=None):
+    """Play games across processes into a SharedResults (the caller closes and unlinks it)
+
+    Game g is seeded with game_seed(seed, 0, g), so the results do not depend on
+    the number of processes. With a scoreboard, the parent records every game on it
+    once the workers are done.
+    """
+    from multiprocessing import Pool
+
+    if ship_list is None:
+        ship_list = Game().ships_to_place
+    size = CLASSIC_RULES.size  # headless players use the classic board
+    results = SharedResults(games, processes, len(ship_list), size * size)
+    bounds = [games * w // processes for w in range(processes + 1)]
+    jobs = [(results.spec, w, bounds[w], bounds[w + 1], seed, ship_list, shooters) for w in range(processes)]
+    try:
+        with Pool(processes) as pool:
+            pool.starmap(_play_shared, jobs)
+    except BaseException:
+        results.close()
+        results.unlink()
+        raise
+    if scoreboard is not None:
+        for winner, shots, duration in zip(results.winner.tolist(), results.shots_to_win.tolist(),
+                                           results.duration.tolist()):
+            scoreboard.record_game(shooters[0], shooters[1], shooters[winner], shots, duration)
+    return results
+
+
+def compare_strategies(names, games=200, seed=0, ship_list=None, budget=None, placement="random", scoreboard=None):
+    """Play every pair of shot strategies against each other (or one against itself)
+
+    Each pairing plays games games with the seats swapped every other game. Every
+    decision is timed (see strategies.TimedShooter) and held to budget seconds, and
+    every game is recorded on scoreboard if one is given.
+    Returns {name: {"win_rate", "shots_per_win", "choose": latency summary,
+    "update": latency summary, "fallbacks"}} plus each strategy's meters under "meters".
+    """
+    if ship_list is None:
+        ship_list = Game().ships_to_place
+    names = list(names)
+    pairs = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]] or [(names[0], names[0])]
+    stats = {name: {"games": 0, "wins": 0, "shots": 0, "fallbacks": 0,
+                    "meter": LatencyMeter(), "update_meter": LatencyMeter()} for name in names}
+    placer = make_placement(placement)
+    for p, pair in enumerate(pairs):
+        for g in range(games):
+            seats = pair if g % 2 == 0 else pair[::-1]
+            timed = []
+
+            def ai(seat, player):
+                entry = stats[seats[seat]]
+                shooter = make_shooter(seats[seat], player, budget, meter=entry["meter"],
+                                       update_meter=entry["update_meter"])
+                timed.append(shooter)
+                return shooter
+
+            _, winner, shots, _ = _play(ship_list, game_seed(seed, p, g), seats, [placer, placer], ai, scoreboard)
+            for seat, shooter in enumerate(timed):
+                entry = stats[seats[seat]]
+                entry["games"] += 1
+                entry["fallbacks"] += shooter.fallbacks
+            stats[seats[winner]]["wins"] += 1
+            stats[seats[winner]]["shots"] += len(shots[1 - winner])
+    report = {}
+    for name, entry in stats.items():
+        report[name] = {"win_rate": entry["wins"] / entry["games"],
+                        "shots_per_win": entry["shots"] / entry["wins"] if entry["wins"] else None,
+                        "choose": entry["meter"].summary(), "update": entry["update_meter"].summary(),
+                        "fallbacks": entry["fallbacks"],
+                        "meters": (entry["meter"], entry["update_meter"])}
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare shot strategies on strength and decision time")
+    parser.add_argument("strategies", nargs="*", default=sorted(SHOOTERS))
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-us", type=float, help="time budget per shot in microseconds")
+    parser.add_argument("--placement", default="random")
+    parser.add_argument("--histograms", action="store_true")
+    parser.add_argument("--scoreboard", help="SQLite file to record every game in")
+    args = parser.parse_args()
+
+    budget = None if args.budget_us is None else args.budget_us / 1e6
+    scoreboard = None
+    if args.scoreboard is not None:
+        from scoreboard import Scoreboard
+        scoreboard = Scoreboard(args.scoreboard)
+    try:
+        report = compare_strategies(args.strategies, args.games, args.seed, budget=budget, placement=args.placement,
+                                    scoreboard=scoreboard)
+    finally:
+        if scoreboard is not None:
+            scoreboard.close()
+    for name, r in report.items():
+        c = r["choose"]
+        shots = "-" if r["shots_per_win"] is None else f"{r['shots_per_win']:.1f}"
+        print(f"{name}: win rate {r['win_rate']:.3f}, {shots} shots per win, "
+              f"choose p50 {c['p50_us']:.2f} us p99 {c['p99_us']:.2f} us max {c['max_us']:.1f} us, "
+              f"update mean {r['update']['mean_us']:.2f} us, {c['overruns']} overruns, {r['fallbacks']} fallbacks")
+        if args.histograms:
+            print(r["meters"][0].format_histogram())
@@ -0,0 +1,397 @@
+import time
+
+from classes import Ship
+
+# Strategy registries: name -> class. Plugins add themselves with register_shooter / register_placement.
+SHOOTERS = {}
+PLACEMENTS = {}
+
+
+def register_shooter(cls):
+    """Class decorator: make a ShotStrategy available by its name"""
+    SHOOTERS[cls.name] = cls
+    return cls
+
+
+def register_placement(cls):
+    """Class decorator: make a PlacementStrategy available by its name"""
+    PLACEMENTS[cls.name] = cls
+    return cls
+
+
+# CLASS: ShotStrategy
+class ShotStrategy:
+    """Base class of shot strategies
+
+    A strategy picks targets for one player: choose() returns (y, x) of a cell the
+    player has not fired at, and update() is told what each shot hit (the Ship, or
+    None for a miss), whoever picked the cell.
+    """
+    name = None
+
+    def __init__(self, player, rng=None):
+        self.player = player
+        self.rng = rng
+
+    def choose(self):
+        raise NotImplementedError
+
+    def update(self, y, x, result):
+        pass
+
+
+# CLASS: RandomShooter
+@register_shooter
+class RandomShooter(ShotStrategy):
+    """Fires at random untried cells"""
+    name = "random"
+
+    def choose(self):
+        return self.player.random_target(self.rng)
+
+
+# CLASS: HuntTargetShooter
+@register_shooter
+class HuntTargetShooter(RandomShooter):
+    """Random hunting; after a hit, works through the neighbours until the ship sinks"""
+    name = "hunt_target"
+
+    def __init__(self, player, rng=None):
+        super().__init__(player, rng)
+        self.targets = []
+
+    def choose(self):
+        while self.targets:
+            y, x = self.targets.pop()
+            if not self.player.has_shot(y, x):
+                return y, x
+        return self.player.random_target(self.rng)
+
+    def update(self, y, x, result):
+        if isinstance(result, Ship):
+            if result.is_sunk():
+                # Ships never touch, so nothing around a sunk ship is worth trying
+                self.targets = []
+                return
+            size = self.player.guess_board.size
+            for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                if 0 <= ny < size and 0 <= nx < size:
+                    self.targets.append((ny, nx))
+
+
+# CLASS: BookShooter
+@register_shooter
+class BookShooter(RandomShooter):
+    """Opens from an opening_book.OpeningBook, then fires at the most likely cell
+
+    The book covers the first hits and misses; after the first sink (or a shot off
+    the book) each shot goes to the highest endgame.placement_density score, and to
+    the exact EndgameSolver once only endgame_ships ships are left.
+    """
+    name = "book"
+    endgame_ships = 2  # exact enumeration of three ships can take a fifth of a second per shot
+    _books = {}    # (size, lengths) -> OpeningBook, shared by every instance
+    _solvers = {}  # (size, adjacency) -> EndgameSolver
+
+    def __init__(self, player, rng=None):
+        super().__init__(player, rng)
+        self.fleet = None     # taken from the player's own fleet on the first shot
+        self.outcomes = []    # hit/miss of each book shot so far
+        self.in_book = True
+        self.planned = None   # the cell the book asked for last
+        self.sunk = []        # names of the ships sunk so far
+
+    def _start(self):
+        from opening_book import OpeningBook
+        from rules import CLASSIC_FLEET
+
+        board = self.player.guess_board
+        self.fleet = [(ship.name, ship.length) for ship in self.player.board.ships] or list(CLASSIC_FLEET)
+        # Books are built for the 'forbidden' rule and for cells that fit in a byte
+        if board.tables.adjacency != 'forbidden' or board.size > 15:
+            self.in_book = False
+            return
+        key = (board.size, tuple(length for _, length in self.fleet))
+        if key not in self._books:
+            self._books[key] = OpeningBook(self.fleet, board.size)
+        self.book = self._books[key]
+
+    def choose(self):
+        if self.fleet is None:
+            self._start()
+        if self.in_book:
+            target = self.book.lookup(self.outcomes)
+            if target is not None and not self.player.has_shot(*target):
+                self.planned = target
+                return target
+            self.in_book = False
+        return self._best_shot()
+
+    def _best_shot(self):
+        import numpy as np
+        from endgame import EndgameSolver, board_masks, placement_density, remaining_lengths
+
+        board = self.player.guess_board
+        size, adjacency = board.size, board.tables.adjacency
+        misses, hits, sunk = board_masks(board)
+        lengths = remaining_lengths(self.fleet, self.sunk)
+        if len(lengths) <= self.endgame_ships:
+            key = (size, adjacency)
+            solver = self._solvers.get(key)
+            if solver is None:
+                solver = self._solvers[key] = EndgameSolver(size, adjacency=adjacency)
+            scores = solver.probabilities_from_masks(misses, hits, sunk, lengths).ravel().copy()
+        else:
+            scores = placement_density(misses, hits, sunk, lengths, size, adjacency=adjacency)
+        # Skip every fired cell, including any the guess board was not told about
+        shots = self.player.shots
+        for cell in range(size * size):
+            if (shots >> cell) & 1:
+                scores[cell] = 0
+        if scores.max() <= 0:
+            return self.player.random_target(self.rng)
+        return divmod(int(np.argmax(scores)), size)
+
+    def update(self, y, x, result):
+        if self.in_book:
+            # The book only knows its own shots, and only hits and misses
+            if (y, x) != self.planned:
+                self.in_book = False
+            else:
+                self.outcomes.append(result is not None)
+        if isinstance(result, Ship) and result.is_sunk():
+            self.in_book = False
+            self.sunk.append(result.name)
+
+
+# CLASS: PlacementStrategy
+class PlacementStrategy:
+    """Base class of fleet placement strategies: place() puts every ship of ship_list on an empty board"""
+    name = None
+
+    def __init__(self, rng=None):
+        self.rng = rng
+
+    def place(self, board, ship_list):
+        raise NotImplementedError
+
+
+# CLASS: RandomPlacement
+@register_placement
+class RandomPlacement(PlacementStrategy):
+    """Board.place_fleet_random: a random legal layout"""
+    name = "random"
+
+    def place(self, board, ship_list):
+        board.place_fleet_random(ship_list)
+
+
+# CLASS: UniformPlacement
+@register_placement
+class UniformPlacement(PlacementStrategy):
+    """Exactly uniform over all legal layouts (layout_counter.LayoutCounter; the count table is built once)"""
+    name = "uniform"
+    _counters = {}  # (size, fleet, adjacency) -> LayoutCounter, shared by every instance
+
+    def place(self, board, ship_list):
+        from layout_counter import LayoutCounter
+        from rules import Rules
+
+        rules = Rules(board.size, ship_list, board.tables.adjacency)
+        key = (rules.size, rules.fleet, rules.adjacency)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = LayoutCounter(rules)
+        counter.place(board, self.rng)
+
+
+# CLASS: LibraryPlacement
+@register_placement
+class LibraryPlacement(PlacementStrategy):
+    """A layout from the optimised placement_optimizer.LayoutLibrary, randomly mirrored"""
+    name = "library"
+    _libraries = {}
+
+    def place(self, board, ship_list):
+        from placement_optimizer import LayoutLibrary
+
+        key = (board.size, tuple(ship_list))
+        library = self._libraries.get(key)
+        if library is None:
+            library = self._libraries[key] = LayoutLibrary(ship_list, board.size)
+        library.place(board, self.rng)
+
+
+# CLASS: LatencyMeter
+class LatencyMeter:
+    """Histogram of decision times in nanoseconds
+
+    Buckets split every power of two into four, so a bucket is never more than 25%
+    wide and recording a time is a bit_length and a list increment. Percentiles are
+    read off the histogram (to bucket precision); count, total and max are exact.
+    """
+
+    def __init__(self):
+        self.buckets = []
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.overruns = 0  # decisions that took longer than the budget
+
+    @staticmethod
+    def bucket(ns):
+        if ns < 4:
+            return ns
+        bits = ns.bit_length()
+        return (bits - 2) * 4 + ((ns >> (bits - 3)) & 3)
+
+    @staticmethod
+    def bucket_bounds(index):
+        """[low, high) nanoseconds covered by a bucket"""
+        if index < 4:
+            return index, index + 1
+        shift = index // 4 - 1
+        low = (4 + index % 4) << shift
+        return low, low + (1 << shift)
+
+    def record(self, ns):
+        index = self.bucket(ns)
+        buckets = self.buckets
+        if index >= len(buckets):
+            buckets.extend([0] * (index + 1 - len(buckets)))
+        buckets[index] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def merge(self, other):
+        if len(other.buckets) > len(self.buckets):
+            self.buckets.extend([0] * (len(other.buckets) - len(self.buckets)))
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.overruns += other.overruns
+
+    def percentile(self, q):
+        """Upper edge (ns) of the bucket holding the q-th percentile (0 when nothing was recorded)"""
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(self.bucket_bounds(i)[1], self.max_ns)
+        return self.max_ns
+
+    def histogram(self):
+        """[(low ns, high ns, count)] of the non-empty buckets"""
+        return [self.bucket_bounds(i) + (n,) for i, n in enumerate(self.buckets) if n]
+
+    def summary(self):
+        """Decision count, mean/p50/p99/max in microseconds and budget overruns"""
+        mean = self.total_ns / self.count if self.count else 0
+        return {"decisions": self.count, "mean_us": mean / 1000, "p50_us": self.percentile(50) / 1000,
+                "p99_us": self.percentile(99) / 1000, "max_us": self.max_ns / 1000, "overruns": self.overruns}
+
+    def format_histogram(self, width=40):
+        """Text bar chart of the histogram, one line per non-empty bucket"""
+        rows = self.histogram()
+        peak = max((n for _, _, n in rows), default=0)
+        lines = []
+        for low, high, n in rows:
+            bar = '#' * max(1, round(width * n / peak))
+            lines.append(f"{low / 1000:>10.2f}-{high / 1000:<10.2f}us {n:>9} {bar}")
+        return "\n".join(lines)
+
+
+# CLASS: TimedShooter
+class TimedShooter:
+    """Wraps a ShotStrategy to time every decision and hold it to a time budget
+
+    choose() and update() are timed into separate meters. A running Python call
+    cannot be interrupted, so the budget (seconds per choose()) is enforced after
+    the fact: a late or illegal answer is thrown away and the shot goes to a random
+    untried cell instead. After max_overruns late answers the strategy is no longer
+    asked at all.
+    """
+
+    def __init__(self, strategy, budget=None, meter=None, update_meter=None, max_overruns=None):
+        self.strategy = strategy
+        self.name = strategy.name
+        self.player = strategy.player
+        self.budget_ns = None if budget is None else int(budget * 1e9)
+        self.meter = meter if meter is not None else LatencyMeter()
+        self.update_meter = update_meter if update_meter is not None else LatencyMeter()
+        self.max_overruns = max_overruns
+        self.overruns = 0
+        self.invalid = 0   # answers that were off the board or already fired at
+        self.fallbacks = 0  # shots picked at random instead
+
+    @property
+    def disqualified(self):
+        return self.max_overruns is not None and self.overruns >= self.max_overruns
+
+    def choose(self):
+        if self.disqualified:
+            self.fallbacks += 1
+            return self.player.random_target()
+        start = time.perf_counter_ns()
+        target = self.strategy.choose()
+        elapsed = time.perf_counter_ns() - start
+        self.meter.record(elapsed)
+        if self.budget_ns is not None and elapsed > self.budget_ns:
+            self.overruns += 1
+            self.meter.overruns += 1
+            self.fallbacks += 1
+            return self.player.random_target()
+        size = self.player.guess_board.size
+        if target is None or not (0 <= target[0] < size and 0 <= target[1] < size) or self.player.has_shot(*target):
+            self.invalid += 1
+            self.fallbacks += 1
+            return self.player.random_target()
+        return target
+
+    def update(self, y, x, result):
+        start = time.perf_counter_ns()
+        self.strategy.update(y, x, result)
+        self.update_meter.record(time.perf_counter_ns() - start)
+
+
+# CLASS: TimedPlacement
+class TimedPlacement:
+    """Wraps a PlacementStrategy the same way: a fleet placed too late, or not in full, is redone at random"""
+
+    def __init__(self, strategy, budget=None, meter=None):
+        self.strategy = strategy
+        self.name = strategy.name
+        self.budget_ns = None if budget is None else int(budget * 1e9)
+        self.meter = meter if meter is not None else LatencyMeter()
+        self.fallbacks = 0
+
+    def place(self, board, ship_list):
+        start = time.perf_counter_ns()
+        self.strategy.place(board, ship_list)
+        elapsed = time.perf_counter_ns() - start
+        self.meter.record(elapsed)
+        late = self.budget_ns is not None and elapsed > self.budget_ns
+        if late:
+            self.meter.overruns += 1
+        if late or len(board.ships) != len(ship_list):
+            self.fallbacks += 1
+            board.ships.clear()
+            board.grid[...] = 0
+            board.place_fleet_random(ship_list)
+
+
+def make_shooter(name, player, budget=None, rng=None, **kwargs):
+    """A registered shot strategy for player, timed and held to budget"""
+    return TimedShooter(SHOOTERS[name](player, rng), budget, **kwargs)
+
+
+def make_placement(name, budget=None, rng=None, **kwargs):
+    """A registered placement strategy, timed and held to budget"""
+    return TimedPlacement(PLACEMENTS[name](rng), budget, **kwargs)
@@ -0,0 +1,109 @@
+import sys
+import numpy as np
+
+from rules import row_label
+
+# ANSI escape sequences
+RESET = "\x1b[0m"
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_BELOW = "\x1b[J"
+SAVE_CURSOR = "\x1b7"
+RESTORE_CURSOR = "\x1b8"
+
+CELL_WIDTH = 3
+GAP = 6  # columns between the two boards
+
+# How each grid value is drawn: (glyph, colour) for a fleet board and for a guess board
+FLEET_CELLS = {0: ("·", "\x1b[34m"), 1: ("■", "\x1b[32m"), 2: ("X", "\x1b[1;31m"), -1: ("o", "\x1b[90m")}
+GUESS_CELLS = {0: ("·", "\x1b[34m"), 1: ("x", "\x1b[31m"), 2: ("X", "\x1b[1;31m"), -1: ("o", "\x1b[90m")}
+
+
+def move_to(row, col):
+    return f"\x1b[{row};{col}H"
+
+
+def format_grid(board, guess=False):
+    """Plain-text board (no colour, no pandas), e.g. for logs and non-terminal output"""
+    cells = GUESS_CELLS if guess else FLEET_CELLS
+    lines = ["  " + "".join(f"{c:>{CELL_WIDTH}}" for c in range(1, board.size + 1))]
+    for y, label in enumerate(board.labels):
+        lines.append(f"{label:>2}" + "".join(f"{cells[int(v)][0]:>{CELL_WIDTH}}" for v in board.grid[y]))
+    return "\n".join(lines)
+
+
+# CLASS: TerminalRenderer
+class TerminalRenderer:
+    """Draws a fleet board and a guess board side by side with ANSI colours
+
+    The first render clears the screen and draws everything. After that, only the
+    cells and titles that differ from what is on screen are rewritten, by moving the
+    cursor to them. Prompts and messages go in the area below the boards.
+    """
+
+    def __init__(self, stream=None, colour=True):
+        self.stream = stream if stream is not None else sys.stdout
+        self.colour = colour
+        self._shown = None  # (size, left grid, right grid, titles) currently on screen
+
+    def reset(self):
+        """Force a full redraw on the next render"""
+        self._shown = None
+
+    def _cell(self, value, guess):
+        glyph, colour = (GUESS_CELLS if guess else FLEET_CELLS)[int(value)]
+        if self.colour:
+            return f" {colour}{glyph}{RESET} "
+        return f" {glyph} "
+
+    def _board_col(self, side, x, size):
+        # 1-based screen column of cell x of the left (0) or right (1) board
+        left = 1 + side * (3 + size * CELL_WIDTH + GAP)
+        return left + 3 + x * CELL_WIDTH
+
+    def render(self, player, title=None, clear_messages=True):
+        """Show player's fleet and guess boards
+
+        With clear_messages=False the cursor and anything printed below the boards
+        are left alone, so it can be used to show the result of a shot under its message.
+        """
+        fleet, guess = player.board.grid, player.guess_board.grid
+        size = player.board.size
+        titles = (title or f"{player.name}'s fleet", "Shots")
+        out = []
+
+        if self._shown is None or self._shown[0] != size:
+            out.append(CLEAR_SCREEN)
+            out.append(self._full_frame(fleet, guess, titles, size))
+        else:
+            _, shown_fleet, shown_guess, shown_titles = self._shown
+            if not clear_messages:
+                out.append(SAVE_CURSOR)
+            if titles != shown_titles:
+                out.append(move_to(1, 1) + "\x1b[2K" + self._title_line(titles, size))
+            # Rewrite only the cells that changed since the last frame
+            for side, (grid, shown, is_guess) in enumerate(((fleet, shown_fleet, False),
+                                                             (guess, shown_guess, True))):
+                for y, x in np.argwhere(grid != shown):
+                    out.append(move_to(3 + y, self._board_col(side, x, size)) + self._cell(grid[y, x], is_guess))
+            if not clear_messages:
+                out.append(RESTORE_CURSOR)
+
+        if clear_messages:
+            out.append(move_to(size + 4, 1) + CLEAR_BELOW)
+        self.stream.write("".join(out))
+        self.stream.flush()
+        self._shown = (size, fleet.copy(), guess.copy(), titles)
+
+    def _title_line(self, titles, size):
+        width = 3 + size * CELL_WIDTH
+        return f"{titles[0]:<{width + GAP}}{titles[1]}"
+
+    def _full_frame(self, fleet, guess, titles, size):
+        header = "   " + "".join(f"{c:>{CELL_WIDTH}}" for c in range(1, size + 1))
+        lines = [self._title_line(titles, size), header + " " * GAP + header]
+        for y in range(size):
+            label = f"{row_label(y):>2} "
+            left = "".join(self._cell(v, False) for v in fleet[y])
+            right = "".join(self._cell(v, True) for v in guess[y])
+            lines.append(label + left + " " * GAP + label + right)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,194 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from array import array
+
+FRAME = struct.Struct('<BH')  # record kind, payload length
+CRC = struct.Struct('<I')     # CRC32 of kind, length and payload
+
+# Record kinds
+START, PLACE, UNPLACE, SHOTS, TURN, END = b'GPUSTE'
+KIND_NAMES = {START: 'start', PLACE: 'place', UNPLACE: 'unplace', SHOTS: 'shots', TURN: 'turn', END: 'end'}
+
+
+# CLASS: GameLog
+class GameLog:
+    """Append-only write-ahead log of matches, with group commit
+
+    Every placement and shot is appended as a small framed record (kind, length,
+    payload, CRC32). Appending only copies the record into a buffer; a background
+    thread writes and fsyncs whatever has built up at most every sync_interval
+    seconds, so one fsync covers many moves. A crash loses at most that window;
+    sync() waits until everything appended so far is on disk. If a write fails the
+    log stops, and every later append or sync raises that OSError.
+    """
+
+    def __init__(self, path, sync_interval=0.05):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._buffer = bytearray()
+        self._appended = 0  # records appended so far
+        self._durable = 0   # records known to be on disk
+        self._syncing = 0   # callers waiting in sync()
+        self._closed = False
+        self.error = None   # the OSError that stopped the writer, if any
+        self._cond = threading.Condition()
+        # Cut off a record torn by a crash, or new records would be appended after it and never read
+        if os.path.exists(path):
+            valid = _valid_length(path)
+            if valid < os.path.getsize(path):
+                os.truncate(path, valid)
+        self._file = open(path, 'ab')
+        self._writer = threading.Thread(target=self._write_loop, name="wal-writer", daemon=True)
+        self._writer.start()
+
+    def _append(self, kind, payload=b''):
+        frame = FRAME.pack(kind, len(payload)) + payload
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Game log is closed.")
+            if self.error is not None:
+                raise self.error
+            if not self._buffer:
+                self._cond.notify_all()  # start a new commit window
+            self._buffer += frame
+            self._buffer += CRC.pack(zlib.crc32(frame))
+            self._appended += 1
+
+    def start(self, names, rules):
+        """A new match between the named players under rules"""
+        header = {"players": list(names), "size": rules.size, "fleet": [list(s) for s in rules.fleet],
+                  "adjacency": rules.adjacency, "shots_per_turn": rules.shots_per_turn}
+        self._append(START, json.dumps(header, separators=(',', ':')).encode('utf-8'))
+
+    def place(self, seat, index, ship):
+        """Player seat placed ship number index of the fleet"""
+        self._append(PLACE, bytes((seat, index, ship.y, ship.x, ship.vertical)))
+
+    def unplace(self, seat):
+        """Player seat took back their last placement"""
+        self._append(UNPLACE, bytes((seat,)))
+
+    def shots(self, seat, cells):
+        """Player seat fired at cells (y * size + x) together"""
+        self._append(SHOTS, bytes((seat,)) + array('H', cells).tobytes())
+
+    def turn(self, seat):
+        """The turn passes to player seat"""
+        self._append(TURN, bytes((seat,)))
+
+    def finish(self, winner):
+        """The match is over; waits until the whole match is on disk"""
+        self._append(END, bytes((winner,)))
+        self.sync()
+
+    def sync(self):
+        """Block until every record appended so far has been fsynced"""
+        with self._cond:
+            target = self._appended
+            self._syncing += 1
+            self._cond.notify_all()
+            while self._durable < target and self.error is None:
+                self._cond.wait()
+            self._syncing -= 1
+            if self.error is not None:
+                raise self.error
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer:
+                    return
+                # Let more records join this commit unless someone is waiting for it
+                if not self._closed and not self._syncing:
+                    self._cond.wait(self.sync_interval)
+                data, self._buffer = self._buffer, bytearray()
+                upto = self._appended
+            try:
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                # The tail on disk may now be torn, so stop writing; appends and syncs raise e from here on
+                with self._cond:
+                    self.error = e
+                    self._buffer = bytearray()
+                    self._durable = self._appended
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = upto
+                self._cond.notify_all()
+
+    def last_game(self):
+        """(header, moves) of the last match in the log, or None (see read_moves)"""
+        return last_game(self.path)
+
+
+def _frames(data):
+    # (kind, payload, end offset) of every intact record, stopping at the first bad one
+    pos = 0
+    while pos + FRAME.size + CRC.size <= len(data):
+        kind, length = FRAME.unpack_from(data, pos)
+        end = pos + FRAME.size + length
+        if end + CRC.size > len(data) or CRC.unpack_from(data, end)[0] != zlib.crc32(data[pos:end]):
+            return
+        yield kind, data[pos + FRAME.size:end], end + CRC.size
+        pos = end + CRC.size
+
+
+def _valid_length(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    end = 0
+    for _, _, end in _frames(data):
+        pass
+    return end
+
+
+def read_moves(path):
+    """Yield decoded records: ('start', header), ('place', seat, index, y, x, vertical),
+    ('unplace', seat), ('shots', seat, cells), ('turn', seat), ('end', winner)
+
+    Stops at the first torn or corrupt record, which is where a crash cut the log off.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    for kind, payload, _ in _frames(data):
+        name = KIND_NAMES.get(kind)
+        if name == 'start':
+            yield name, json.loads(payload)
+        elif name == 'shots':
+            yield name, payload[0], array('H', payload[1:]).tolist()
+        elif name is not None:
+            yield (name,) + tuple(payload)
+
+
+def last_game(path):
+    """(header, moves) of the last match in a log, or None if there is none"""
+    game = None
+    for record in read_moves(path):
+        if record[0] == 'start':
+            game = (record[1], [])
+        elif game is not None:
+            game[1].append(record)
+    return game